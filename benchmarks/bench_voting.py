@@ -0,0 +1,237 @@
+"""Offline benchmark for the monitoring path.
+
+Drives ``AIPrintMonPlugin.run_voting_sequence`` against a local stub camera
+and a stub OpenAI-compatible LLM (see ``stubs.py``) and writes
+machine-readable results that ``compare.py`` can diff across runs.
+
+Example::
+
+    python benchmarks/bench_voting.py --votes 20 --llm-latency 1.5 --fail-rate 0.3 \\
+        --voting-mode pipelined --output bench_output.json
+
+Requires OctoPrint (for the plugin base classes) and Pillow unless
+``--frames`` points at a directory of recorded JPEGs.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import stubs  # noqa: E402
+from octoprint_ai_printmon import AIPrintMonPlugin  # noqa: E402
+
+
+class FakeSettings(object):
+    def __init__(self, values):
+        self._values = values
+
+    def get_all_hierarchy(self):
+        return dict(self._values)
+
+    def get(self, path):
+        return self._values.get(path[0])
+
+    def get_int(self, path):
+        value = self._values.get(path[0])
+        return int(value) if value is not None else None
+
+    def set(self, path, value):
+        self._values[path[0]] = value
+
+    def save(self):
+        pass
+
+    def global_get(self, path):
+        return None
+
+
+class FakePrinter(object):
+    def __init__(self):
+        self.cancelled_at = None
+        self.paused_at = None
+
+    def cancel_print(self):
+        self.cancelled_at = time.monotonic()
+
+    def pause_print(self):
+        self.paused_at = time.monotonic()
+
+
+class FakeEventBus(object):
+    def __init__(self):
+        self.events = []
+
+    def fire(self, name, payload=None):
+        self.events.append(name)
+
+
+class FakePluginManager(object):
+    def get_plugins(self, *args, **kwargs):
+        return {}
+
+    def send_plugin_message(self, *args, **kwargs):
+        pass
+
+
+def summarize(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "n": len(ordered),
+        "mean": statistics.mean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "max": ordered[-1],
+    }
+
+
+def stub_call(port, path, method="GET"):
+    req = urllib.request.Request("http://127.0.0.1:%d%s" % (port, path), method=method, data=b"" if method == "POST" else None)
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        return json.loads(resp.read())
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--votes", type=int, default=10, help="voting sequences to run")
+    p.add_argument("--rounds", type=int, default=3)
+    p.add_argument("--round-delay", type=float, default=0, help="seconds between rounds")
+    p.add_argument("--voting-mode", default="sequential", choices=["sequential", "pipelined", "multi_frame"])
+    p.add_argument("--frames", help="directory of recorded .jpg frames (default: synthesized 1080p frames)")
+    p.add_argument("--fps", type=float, default=10.0, help="stub MJPEG stream frame rate")
+    p.add_argument("--mjpeg", action="store_true", help="read frames from the stub MJPEG stream")
+    p.add_argument("--no-preprocess", action="store_true", help="send frames as captured")
+    p.add_argument("--stream", action="store_true", help="use streamed LLM responses")
+    p.add_argument("--llm-latency", type=float, default=1.0, help="stub LLM time to first token (s)")
+    p.add_argument("--llm-jitter", type=float, default=0.2, help="uniform +/- jitter on the latency (s)")
+    p.add_argument("--token-delay", type=float, default=0.02, help="stub delay per 4-character token (s)")
+    p.add_argument("--error-rate", type=float, default=0.0, help="fraction of LLM requests answered with HTTP 500")
+    p.add_argument("--fail-rate", type=float, default=0.0, help="fraction of frames judged 'fail'")
+    p.add_argument("--reject-multi", action="store_true", help="stub rejects multi-image requests")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--set", action="append", default=[], metavar="KEY=JSON", help="extra plugin setting override")
+    p.add_argument("--label", default="", help="free-form label stored with the results")
+    p.add_argument("--output", help="write results JSON here (default: stdout)")
+    return p.parse_args(argv)
+
+
+def build_plugin(args, ports):
+    snapshot_url = "http://127.0.0.1:%d/?action=snapshot" % ports["camera"]
+    overrides = {
+        "api_endpoint": "http://127.0.0.1:%d/v1/chat/completions" % ports["llm"],
+        "api_key": "",
+        "model": "stub-vision",
+        "monitor_enabled": False,
+        "snapshot_url": snapshot_url,
+        "rounds": args.rounds,
+        "round_delay": args.round_delay,
+        "voting_mode": args.voting_mode,
+        "stream_enabled": args.mjpeg,
+        "preprocess_enabled": not args.no_preprocess,
+        "llm_stream": args.stream,
+        # No plugin data folder outside OctoPrint
+        "history_enabled": False,
+    }
+    for item in args.set:
+        key, _, value = item.partition("=")
+        overrides[key] = json.loads(value)
+
+    plugin = AIPrintMonPlugin()
+    settings = plugin.get_settings_defaults()
+    settings.update(overrides)
+    plugin._settings = FakeSettings(settings)
+    plugin._printer = FakePrinter()
+    plugin._event_bus = FakeEventBus()
+    plugin._plugin_manager = FakePluginManager()
+    plugin._identifier = "ai_printmon"
+    plugin.on_after_startup()
+    return plugin, overrides
+
+
+def run(args):
+    proc, ports = stubs.start_in_process(
+        frames_dir=args.frames,
+        fps=args.fps,
+        latency=args.llm_latency,
+        jitter=args.llm_jitter,
+        error_rate=args.error_rate,
+        fail_rate=args.fail_rate,
+        token_delay=args.token_delay,
+        reject_multi=args.reject_multi,
+        seed=args.seed,
+    )
+    try:
+        plugin, overrides = build_plugin(args, ports)
+        if args.mjpeg:
+            # Only the reader; the scheduler must not fire checks of its own mid-run
+            plugin._start_stream_reader()
+            # Give the reader a moment to buffer the first frame
+            time.sleep(max(0.5, 2.0 / args.fps))
+
+        tracemalloc.start()
+        verdict_times, cancel_times, requests, bytes_sent, actions = [], [], [], [], {}
+        for _ in range(args.votes):
+            stub_call(ports["llm"], "/_reset", method="POST")
+            plugin._printer.cancelled_at = None
+            plugin._last_alert = None
+            events_before = len(plugin._event_bus.events)
+
+            t0 = time.monotonic()
+            plugin.run_voting_sequence()
+            verdict_times.append(time.monotonic() - t0)
+            if plugin._printer.cancelled_at is not None:
+                cancel_times.append(plugin._printer.cancelled_at - t0)
+            for name in plugin._event_bus.events[events_before:]:
+                actions[name] = actions.get(name, 0) + 1
+
+            stats = stub_call(ports["llm"], "/_stats")
+            requests.append(stats["requests"])
+            bytes_sent.append(stats["bytes_received"])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        plugin._stop_stream_reader()
+        plugin.on_shutdown()
+        return {
+            "label": args.label,
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "config": dict(vars(args), plugin_overrides={k: v for k, v in overrides.items() if k != "api_key"}),
+            "stub_frame_bytes": ports["frame_bytes"],
+            "results": {
+                "votes": args.votes,
+                "time_to_verdict_s": summarize(verdict_times),
+                "time_to_cancel_s": summarize(cancel_times),
+                "requests_per_vote": statistics.mean(requests) if requests else None,
+                "bytes_sent_per_vote": statistics.mean(bytes_sent) if bytes_sent else None,
+                "peak_memory_bytes": peak,
+                "events": actions,
+            },
+            "plugin_metrics": plugin._metrics.to_dict(),
+        }
+    finally:
+        proc.terminate()
+        proc.join(timeout=5)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = run(args)
+    text = json.dumps(result, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
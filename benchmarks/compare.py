@@ -0,0 +1,56 @@
+"""Compare two or more bench_voting.py result files.
+
+Usage::
+
+    python benchmarks/compare.py baseline.json candidate.json [...]
+
+Prints each headline metric per run and its change relative to the first file.
+"""
+import json
+import sys
+
+METRICS = (
+    ("time_to_verdict_s", "p50"),
+    ("time_to_verdict_s", "p95"),
+    ("time_to_cancel_s", "p50"),
+    ("time_to_cancel_s", "p95"),
+    ("requests_per_vote", None),
+    ("bytes_sent_per_vote", None),
+    ("peak_memory_bytes", None),
+)
+
+
+def extract(result, key, field):
+    value = result["results"].get(key)
+    if field is not None:
+        value = value.get(field) if isinstance(value, dict) else None
+    return value
+
+
+def main(paths):
+    if len(paths) < 2:
+        raise SystemExit(__doc__)
+    runs = []
+    for path in paths:
+        with open(path) as f:
+            runs.append(json.load(f))
+
+    names = [r.get("label") or path for r, path in zip(runs, paths)]
+    print("%-28s" % "metric" + "".join("%22s" % n[:20] for n in names))
+    for key, field in METRICS:
+        label = key + ("." + field if field else "")
+        base = extract(runs[0], key, field)
+        cells = []
+        for run in runs:
+            value = extract(run, key, field)
+            if value is None:
+                cells.append("%22s" % "-")
+            elif run is runs[0] or not base:
+                cells.append("%22.4g" % value)
+            else:
+                cells.append("%13.4g (%+5.1f%%)" % (value, 100.0 * (value - base) / base))
+        print("%-28s" % label + "".join(cells))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,226 @@
+"""Local stand-ins for a webcam and an OpenAI-compatible vision endpoint.
+
+Both servers run in a child process (see ``start_in_process``) so their
+memory and CPU do not show up in the plugin's measurements. The LLM stub
+exposes ``GET /_stats`` and ``POST /_reset`` for the harness.
+"""
+import glob
+import io
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOUNDARY = "benchframe"
+
+
+def load_frames(directory=None, count=8, size=(1920, 1080)):
+    """Return a list of JPEG byte strings from ``directory`` or synthesized with Pillow."""
+    if directory:
+        paths = sorted(glob.glob(os.path.join(directory, "*.jpg")) + glob.glob(os.path.join(directory, "*.jpeg")))
+        if not paths:
+            raise SystemExit("No .jpg frames found in %s" % directory)
+        frames = []
+        for path in paths:
+            with open(path, "rb") as f:
+                frames.append(f.read())
+        return frames
+
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        raise SystemExit("Pillow is required to synthesize frames; pass --frames DIR with recorded JPEGs instead")
+
+    rng = random.Random(1)
+    frames = []
+    for i in range(count):
+        im = Image.new("RGB", size, (40, 42, 48))
+        draw = ImageDraw.Draw(im)
+        # A "bed", a growing "part" and some sensor noise so JPEG sizes are realistic
+        w, h = size
+        draw.rectangle((w * 0.2, h * 0.6, w * 0.8, h * 0.9), fill=(90, 90, 95))
+        top = h * 0.6 - (i + 1) * h * 0.02
+        draw.rectangle((w * 0.45, top, w * 0.55, h * 0.6), fill=(200, 80, 40))
+        for _ in range(4000):
+            x, y = rng.randrange(w), rng.randrange(h)
+            draw.point((x, y), fill=(rng.randrange(256),) * 3)
+        out = io.BytesIO()
+        im.save(out, format="JPEG", quality=90)
+        frames.append(out.getvalue())
+    return frames
+
+
+def make_camera_handler(frames, fps):
+    cycle = itertools.cycle(frames)
+    lock = threading.Lock()
+
+    def next_frame():
+        with lock:
+            return next(cycle)
+
+    class CameraHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if "action=stream" in self.path:
+                self.send_response(200)
+                self.send_header("Content-Type", "multipart/x-mixed-replace;boundary=%s" % BOUNDARY)
+                self.send_header("Connection", "close")
+                self.end_headers()
+                try:
+                    while True:
+                        frame = next_frame()
+                        self.wfile.write(
+                            ("--%s\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n" % (BOUNDARY, len(frame))).encode()
+                        )
+                        self.wfile.write(frame)
+                        self.wfile.write(b"\r\n")
+                        self.wfile.flush()
+                        time.sleep(1.0 / fps)
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+            else:
+                frame = next_frame()
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(frame)))
+                self.end_headers()
+                self.wfile.write(frame)
+
+    return CameraHandler
+
+
+def make_llm_handler(latency, jitter, error_rate, fail_rate, token_delay, reject_multi, seed):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    stats = {"requests": 0, "bytes_received": 0, "errors": 0, "images": 0}
+
+    def roll(p):
+        with lock:
+            return rng.random() < p
+
+    def verdict():
+        if roll(fail_rate):
+            return {"status": "fail", "reason": "spaghetti detected by stub"}
+        return {"status": "ok"}
+
+    class LLMHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, code, obj):
+            body = json.dumps(obj).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.startswith("/_stats"):
+                with lock:
+                    return self._send_json(200, dict(stats))
+            self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length)
+            if self.path.startswith("/_reset"):
+                with lock:
+                    for k in stats:
+                        stats[k] = 0
+                return self._send_json(200, {"ok": True})
+            if self.path.startswith("/api/"):
+                # Ollama-native endpoints used for warm-up and keep-alive
+                return self._send_json(200, {"done": True})
+
+            req = json.loads(body or b"{}")
+            content = (req.get("messages") or [{}])[-1].get("content")
+            images = 1
+            if isinstance(content, list):
+                images = sum(1 for part in content if part.get("type") == "image_url")
+            with lock:
+                stats["requests"] += 1
+                stats["bytes_received"] += length
+                stats["images"] += images
+
+            with lock:
+                delay = max(0.0, latency + rng.uniform(-jitter, jitter))
+            time.sleep(delay)
+
+            if roll(error_rate):
+                with lock:
+                    stats["errors"] += 1
+                return self._send_json(500, {"error": "stub failure"})
+            if images > 1 and reject_multi:
+                return self._send_json(400, {"error": "only one image per request is supported"})
+
+            if images > 1:
+                text = json.dumps({"frames": [verdict() for _ in range(images)]})
+            else:
+                text = json.dumps(verdict())
+
+            if req.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                try:
+                    for i in range(0, len(text), 4):
+                        chunk = {"choices": [{"index": 0, "delta": {"content": text[i : i + 4]}}]}
+                        self.wfile.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+                        self.wfile.flush()
+                        time.sleep(token_delay)
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                return
+            # Non-streamed replies pay the generation time up front
+            time.sleep(token_delay * ((len(text) + 3) // 4))
+            self._send_json(200, {"choices": [{"index": 0, "message": {"role": "assistant", "content": text}}]})
+
+    return LLMHandler
+
+
+def _serve(handler, ready, key):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    ready.put((key, server.server_address[1]))
+    server.serve_forever()
+
+
+def run_servers(ready, frames_dir, fps, llm_options):
+    """Child-process entry point: start camera and LLM stubs and report their ports on ``ready``."""
+    frames = load_frames(frames_dir)
+    ready.put(("frame_bytes", [len(f) for f in frames]))
+    threads = [
+        threading.Thread(target=_serve, args=(make_camera_handler(frames, fps), ready, "camera"), daemon=True),
+        threading.Thread(target=_serve, args=(make_llm_handler(**llm_options), ready, "llm"), daemon=True),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def start_in_process(frames_dir=None, fps=10.0, **llm_options):
+    """Start both stubs in a child process; returns (process, {"camera": port, "llm": port, ...})."""
+    import multiprocessing
+
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    proc = ctx.Process(target=run_servers, args=(ready, frames_dir, fps, llm_options), daemon=True)
+    proc.start()
+    info = {}
+    while len(info) < 3:
+        key, value = ready.get(timeout=60)
+        info[key] = value
+    return proc, info
@@ -1,16 +1,45 @@
 import logging
-import threading
 import time
-import requests
+import asyncio
 import base64
+import hashlib
+import concurrent.futures
 import json
 import os
 import re
+import urllib.parse
 
+import flask
 import octoprint.plugin
 
+from . import imaging
+from .change_gate import FrameChangeGate, change_gate_available
+from .endpoints import Endpoint, EndpointPool, NoEndpointAvailable, build_headers
+from .engine import CheckEngine
+from .history import VerdictHistory
+from .http_client import HttpClient
+from .jobs import JobRegistry
+from .layers import LayerTracker
+from .metrics import MetricsRegistry
+from .mjpeg import MjpegStreamReader, stream_url_from_snapshot
+from .runtime_config import VERDICT_SCHEMA, RuntimeConfig
+from .scheduler import MonitorScheduler
+from .streaming import read_streamed_completion
+from .verdict_cache import VerdictCache, perceptual_hash
+
 logger = logging.getLogger("octoprint.plugins.ai_printmon")
 
+MULTI_FRAME_INSTRUCTION = (
+    "These are {count} webcam frames of the same print, taken a few seconds apart, in order."
+    " Judge each frame separately and respond with ONLY a JSON object of the form"
+    ' {{"frames": [{{"status": "ok"}}, {{"status": "fail", "reason": "..."}}, ...]}}'
+    " containing exactly {count} entries in frame order."
+)
+# Stands in for the model name in a multi-frame body serialized before the endpoint is known
+MODEL_PLACEHOLDER = "\x00model\x00"
+# HTTP statuses that mean the provider does not accept several images per request
+MULTI_FRAME_REJECT_STATUS = (400, 413, 415, 422)
+
 
 class AIPrintMonPlugin(
     octoprint.plugin.SettingsPlugin,
@@ -19,19 +48,53 @@ class AIPrintMonPlugin(
     octoprint.plugin.EventHandlerPlugin,
     octoprint.plugin.SimpleApiPlugin,
     octoprint.plugin.StartupPlugin,
+    octoprint.plugin.ShutdownPlugin,
 ):
     """Core implementation for the OctoPrint AI Print Monitor plugin."""
 
     def __init__(self):
         self._monitoring = False
-        self._timer = None
+        self._scheduler = MonitorScheduler(self._timer_tick, self._next_check_interval)
         self._timer_interval = 300  # seconds default (5 minutes)
-        self._rounds = 3
-        self._round_delay = 3
         self._cooldown = 15 * 60
-        self._last_alert = 0
-        self._snapshot_url = None
+        self._last_alert = None
+        self._print_started_at = None
+        self._ok_streak = 0
+        self._last_vote_suspicious = False
+        self._adaptive = {"enabled": False}
+        self._metrics = self._create_metrics()
+        self._jobs = JobRegistry()
+        self._warmup_on_start = True
+        self._keepalive_seconds = 0
+        self._release_on_end = True
+        self._ollama_keep_alive = "30m"
         self._consecutive_errors = 0
+        self._http = None
+        self._preprocess = {"enabled": False}
+        self._last_frame_info = None
+        self._change_gate_enabled = False
+        self._change_gate = FrameChangeGate()
+        self._verdict_cache_enabled = False
+        self._verdict_cache = VerdictCache()
+        self._engine = None
+        self._multi_frame_unsupported = set()
+        self._endpoints = EndpointPool([])
+        self._stream_enabled = False
+        self._stream_url = None
+        self._stream_buffer_frames = 4
+        self._stream_max_frame_age = 2.0
+        self._stream_reader = None
+        self._history = None
+        self._history_thumbnail_edge = 160
+        self._current_print = None
+        self._trigger_mode = "interval"
+        self._layer_every_n = 5
+        self._layer_min_interval = 120.0
+        self._layer_capture_delay = 3.0
+        self._layer_fallback = 15 * 60
+        self._layers = LayerTracker()
+        # Replaced as a whole by apply_settings; readers take one reference per check
+        self._config = RuntimeConfig.from_settings(self.get_settings_defaults())
 
     # --- Settings / lifecycle ------------------------------------------------
     def get_settings_defaults(self):
@@ -43,9 +106,62 @@ class AIPrintMonPlugin(
             "monitor_enabled": True,
             "snapshot_url": "http://localhost:8080/?action=snapshot",
             "interval_minutes": 5,
+            "trigger_mode": "interval",
+            "layer_every_n": 5,
+            "layer_min_interval_seconds": 120,
+            "layer_capture_delay_seconds": 3,
+            "layer_fallback_minutes": 15,
             "rounds": 3,
             "round_delay": 3,
             "cooldown_minutes": 15,
+            "adaptive_interval": True,
+            "adaptive_early_minutes": 20,
+            "adaptive_early_factor": 0.5,
+            "adaptive_suspicious_factor": 0.5,
+            "adaptive_relax_after": 6,
+            "adaptive_relax_factor": 2.0,
+            "http_pool_size": 4,
+            "http_connect_timeout": 5,
+            "http_read_timeout": 30,
+            "http_retries": 2,
+            "http_retry_backoff": 0.5,
+            "preprocess_enabled": True,
+            "preprocess_roi": None,
+            "preprocess_max_edge": 1024,
+            "preprocess_jpeg_quality": 80,
+            "preprocess_grayscale": False,
+            "change_gate_enabled": False,
+            "change_gate_mean_threshold": 4.0,
+            "change_gate_pixel_delta": 24,
+            "change_gate_changed_fraction": 0.01,
+            "change_gate_max_age_minutes": 30,
+            "verdict_cache_enabled": False,
+            "verdict_cache_ttl_seconds": 300,
+            "verdict_cache_max_entries": 64,
+            "verdict_cache_max_distance": 4,
+            "stream_enabled": False,
+            "stream_url": "",
+            "stream_buffer_frames": 4,
+            "stream_max_frame_age": 2.0,
+            "llm_stream": False,
+            "llm_stream_collect_reason": True,
+            "llm_max_tokens": 0,
+            "llm_response_format": "none",
+            "warmup_on_print_start": True,
+            "keepalive_minutes": 4,
+            "release_model_on_print_end": True,
+            "ollama_keep_alive": "30m",
+            "voting_mode": "sequential",
+            "io_workers": 4,
+            "history_enabled": True,
+            "history_max_mb": 50,
+            "history_max_age_days": 30,
+            "history_thumbnail_edge": 160,
+            "fallback_endpoints": [],
+            "circuit_failure_threshold": 3,
+            "circuit_reset_seconds": 120,
+            "hedge_requests": False,
+            "hedge_min_samples": 5,
             "failure_rules": [
                 {"threshold": "1/3", "action": "nothing"},
                 {"threshold": "2/3", "action": "warn"},
@@ -59,23 +175,161 @@ class AIPrintMonPlugin(
             ),
         }
 
-    def on_after_startup(self):
-        logger.info("AI Print Monitor plugin started")
-        # In the real plugin, read settings and attach event hooks here.
+    def _configure_history(self, s):
+        if not s.get("history_enabled", True):
+            if self._history is not None:
+                self._history.close()
+                self._history = None
+            return
+        if self._history is None:
+            try:
+                path = os.path.join(self.get_plugin_data_folder(), "history.sqlite3")
+                self._history = VerdictHistory(path)
+            except Exception:
+                logger.exception("Could not open the verdict history database; history is disabled")
+                return
+        self._history.max_bytes = int(float(s.get("history_max_mb", 50)) * 1024 * 1024)
+        self._history.max_age = float(s.get("history_max_age_days", 30)) * 86400
+        self._history_thumbnail_edge = int(s.get("history_thumbnail_edge", 160) or 0)
+
+    def _configure_endpoints(self, s):
+        """Build the ordered endpoint list: the main endpoint first, then ``fallback_endpoints``.
+
+        Endpoints whose URL, model and key did not change keep their breaker
+        state and latency history across settings saves.
+        """
+        threshold = int(s.get("circuit_failure_threshold", 3))
+        reset = float(s.get("circuit_reset_seconds", 120))
+        configs = [{"api_endpoint": s.get("api_endpoint"), "model": s.get("model"), "api_key": s.get("api_key")}]
+        configs.extend(s.get("fallback_endpoints") or [])
+
+        previous = {(ep.url, ep.model, ep.api_key): ep for ep in self._endpoints.endpoints}
+        endpoints = []
+        for cfg in configs:
+            if not isinstance(cfg, dict) or not cfg.get("api_endpoint"):
+                continue
+            key = (cfg["api_endpoint"], cfg.get("model") or s.get("model"), cfg.get("api_key") or "")
+            ep = previous.get(key) or Endpoint(key[0], key[1], key[2], name=cfg.get("name"))
+            ep.breaker.failure_threshold = max(1, threshold)
+            ep.breaker.reset_timeout = reset
+            endpoints.append(ep)
+
+        old = self._endpoints
+        self._endpoints = EndpointPool(
+            endpoints,
+            hedge=bool(s.get("hedge_requests", False)),
+            hedge_min_samples=int(s.get("hedge_min_samples", 5)),
+        )
+        old.close()
 
     def on_after_startup(self):
         logger.info("AI Print Monitor plugin started")
+        # One pooled client for the plugin's lifetime so rounds reuse connections
+        self._http = HttpClient()
+        self._engine = CheckEngine(workers=self._settings.get_int(["io_workers"]) or 4)
+        self._engine.start()
         # Load settings into runtime state
         self.apply_settings(self._settings.get_all_hierarchy())
 
+    def on_shutdown(self):
+        self.stop_monitoring()
+        if self._engine is not None:
+            self._engine.stop()
+            self._engine = None
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+        self._endpoints.close()
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+
     def apply_settings(self, s):
         """Apply validated settings to runtime state (update timer, rounds, etc.)."""
         # map settings to internal state
         self._timer_interval = int(s.get("interval_minutes", 5)) * 60
-        self._rounds = int(s.get("rounds", 3))
-        self._round_delay = int(s.get("round_delay", 3))
         self._cooldown = int(s.get("cooldown_minutes", 15)) * 60
-        self._snapshot_url = s.get("snapshot_url")
+        self._trigger_mode = s.get("trigger_mode", "interval")
+        if self._trigger_mode not in ("interval", "layer"):
+            logger.warning("Unknown trigger_mode %r; using interval", self._trigger_mode)
+            self._trigger_mode = "interval"
+        self._layer_every_n = max(1, int(s.get("layer_every_n", 5)))
+        self._layer_min_interval = max(0.0, float(s.get("layer_min_interval_seconds", 120)))
+        self._layer_capture_delay = max(0.0, float(s.get("layer_capture_delay_seconds", 3)))
+        self._layer_fallback = max(0.0, float(s.get("layer_fallback_minutes", 15) or 0)) * 60
+        self._adaptive = {
+            "enabled": bool(s.get("adaptive_interval", True)),
+            "early_seconds": float(s.get("adaptive_early_minutes", 20)) * 60,
+            "early_factor": float(s.get("adaptive_early_factor", 0.5)),
+            "suspicious_factor": float(s.get("adaptive_suspicious_factor", 0.5)),
+            "relax_after": int(s.get("adaptive_relax_after", 6)),
+            "relax_factor": float(s.get("adaptive_relax_factor", 2.0)),
+        }
+        stream_url = s.get("stream_url") or stream_url_from_snapshot(s.get("snapshot_url"))
+        stream_enabled = bool(s.get("stream_enabled", False)) and bool(stream_url)
+        if s.get("stream_enabled") and not stream_url:
+            logger.warning("MJPEG stream enabled but no stream_url set and none derivable from the snapshot URL")
+        stream_changed = (stream_enabled, stream_url) != (self._stream_enabled, self._stream_url)
+        self._stream_enabled = stream_enabled
+        self._stream_url = stream_url
+        self._stream_buffer_frames = int(s.get("stream_buffer_frames", 4))
+        self._stream_max_frame_age = float(s.get("stream_max_frame_age", 2.0))
+        if stream_changed and self._monitoring:
+            self._stop_stream_reader()
+            self._start_stream_reader()
+
+        self._preprocess = {
+            "enabled": bool(s.get("preprocess_enabled", True)),
+            "roi": imaging.parse_roi(s.get("preprocess_roi")),
+            "max_edge": int(s.get("preprocess_max_edge", 1024) or 0),
+            "quality": min(95, max(10, int(s.get("preprocess_jpeg_quality", 80)))),
+            "grayscale": bool(s.get("preprocess_grayscale", False)),
+        }
+        if self._preprocess["enabled"] and not imaging.imaging_available():
+            logger.warning("Snapshot preprocessing enabled but Pillow is not installed; frames are sent as captured")
+
+        self._change_gate_enabled = bool(s.get("change_gate_enabled", False))
+        self._change_gate.mean_threshold = float(s.get("change_gate_mean_threshold", 4.0))
+        self._change_gate.pixel_delta = float(s.get("change_gate_pixel_delta", 24))
+        self._change_gate.changed_fraction = float(s.get("change_gate_changed_fraction", 0.01))
+        self._change_gate.max_age = float(s.get("change_gate_max_age_minutes", 30)) * 60
+        if self._change_gate_enabled and not change_gate_available():
+            logger.warning("Frame change gate enabled but NumPy/Pillow are not installed; every tick will query the LLM")
+
+        self._verdict_cache_enabled = bool(s.get("verdict_cache_enabled", False))
+        self._verdict_cache.ttl = float(s.get("verdict_cache_ttl_seconds", 300))
+        self._verdict_cache.max_entries = int(s.get("verdict_cache_max_entries", 64))
+        self._verdict_cache.max_distance = int(s.get("verdict_cache_max_distance", 4))
+        if not self._verdict_cache_enabled:
+            self._verdict_cache.clear()
+
+        if s.get("llm_response_format", "none") not in ("none", "json_object", "json_schema"):
+            logger.warning("Unknown llm_response_format %r; sending none", s.get("llm_response_format"))
+
+        self._warmup_on_start = bool(s.get("warmup_on_print_start", True))
+        self._keepalive_seconds = max(0.0, float(s.get("keepalive_minutes", 4) or 0)) * 60
+        self._release_on_end = bool(s.get("release_model_on_print_end", True))
+        self._ollama_keep_alive = s.get("ollama_keep_alive", "30m")
+
+        self._multi_frame_unsupported.clear()
+        if s.get("voting_mode", "sequential") not in ("sequential", "pipelined", "multi_frame"):
+            logger.warning("Unknown voting_mode %r; using sequential", s.get("voting_mode"))
+
+        self._configure_history(s)
+        self._configure_endpoints(s)
+        self._config = RuntimeConfig.from_settings(s, extra_models=[ep.model for ep in self._endpoints.endpoints])
+
+        if self._monitoring:
+            self._scheduler.reschedule()
+
+        if self._http is not None:
+            self._http.configure(
+                pool_size=int(s.get("http_pool_size", 4)),
+                connect_timeout=float(s.get("http_connect_timeout", 5)),
+                read_timeout=float(s.get("http_read_timeout", 30)),
+                retries=int(s.get("http_retries", 2)),
+                backoff=float(s.get("http_retry_backoff", 0.5)),
+            )
 
         enabled = bool(s.get("monitor_enabled", True))
         if enabled and not self._monitoring:
@@ -116,18 +370,16 @@ class AIPrintMonPlugin(
                 endpoint = data.get("endpoint") if isinstance(data, dict) else None
                 api_key = data.get("api_key") if isinstance(data, dict) else None
                 model = data.get("model") if isinstance(data, dict) else None
+                mode = data.get("mode", "text") if isinstance(data, dict) else "text"
 
                 # Server-side validation
                 if not endpoint or not isinstance(endpoint, str) or not re.match(r"^https?://", endpoint):
                     return {"success": False, "message": "Invalid endpoint URL"}
+                if mode not in ("text", "image"):
+                    return {"success": False, "message": "Invalid test mode"}
 
-                ok, info = self.send_text_test_to_llm(endpoint=endpoint, api_key=api_key, model=model)
-                if ok:
-                    logger.info("Test connection OK: %s", info)
-                    return {"success": True, "message": info}
-                else:
-                    logger.warning("Test connection failed: %s", info)
-                    return {"success": False, "message": info}
+                job, created = self.start_test_job(endpoint, api_key, model, mode)
+                return {"success": True, "job_id": job["id"], "deduplicated": not created, "job": job}
             elif command == "get_preset":
                 preset = None
                 if isinstance(data, dict):
@@ -145,13 +397,13 @@ class AIPrintMonPlugin(
                 settings = data.get("settings") if isinstance(data, dict) else None
                 if not settings:
                     return {"success": False, "message": "missing settings"}
-                # OctoPrint's SettingsPlugin handles persistence if we call save()
-                # But here we want to apply to runtime immediately
-                self.apply_settings(settings)
-                # Persist those specific values into OctoPrint settings
+                # Persist the submitted values first, then apply the full merged
+                # settings: the UI only sends the keys it edits, and the rest
+                # must keep their saved values rather than fall back to defaults
                 for k, v in settings.items():
                     self._settings.set([k], v)
                 self._settings.save()
+                self.apply_settings(self._settings.get_all_hierarchy())
                 return {"success": True, "message": "settings applied and saved"}
 
             return {"unknown": True}
@@ -159,6 +411,53 @@ class AIPrintMonPlugin(
             logger.exception("Error in on_api_command")
             return {"success": False, "message": "internal error"}
 
+    def on_api_get(self, request):
+        view = request.values.get("view")
+        if view == "test_job":
+            job = self._jobs.get(request.values.get("id"))
+            if job is None:
+                return flask.make_response(flask.jsonify(success=False, message="unknown job"), 404)
+            return flask.jsonify(success=True, job=job)
+        if view == "history":
+            if self._history is None:
+                return flask.make_response(flask.jsonify(success=False, message="history is disabled"), 404)
+            try:
+                before = request.values.get("before")
+                page = self._history.page(
+                    before=int(before) if before else None,
+                    limit=int(request.values.get("limit", 50)),
+                    print_id=request.values.get("print") or None,
+                )
+            except ValueError:
+                return flask.make_response(flask.jsonify(success=False, message="invalid paging parameters"), 400)
+            return flask.jsonify(success=True, **page)
+        if view == "thumbnail":
+            jpeg = None
+            if self._history is not None:
+                try:
+                    jpeg = self._history.thumbnail(int(request.values.get("id", "")))
+                except ValueError:
+                    pass
+            if jpeg is None:
+                return flask.make_response(flask.jsonify(success=False, message="unknown thumbnail"), 404)
+            return flask.make_response(jpeg, 200, {"Content-Type": "image/jpeg", "Cache-Control": "max-age=86400"})
+        if view == "metrics":
+            if request.values.get("format") == "prometheus":
+                return flask.make_response(
+                    self._metrics.to_prometheus(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+                )
+            data = self._metrics.to_dict()
+            data["verdict_cache"] = self._verdict_cache.stats()
+            data["endpoints"] = self._endpoints.stats()
+            if self._history is not None:
+                data["history"] = self._history.stats()
+            return flask.jsonify(data)
+        return flask.jsonify(
+            monitoring=self._monitoring,
+            paused=self._scheduler.paused,
+            next_check_in=self._scheduler.seconds_until_next() if self._monitoring else None,
+        )
+
     def apply_provider_preset(self, preset_name):
         presets = {
             "Ollama": {"endpoint": "http://localhost:11434/v1/chat/completions", "api_key": "", "model": "llava:latest"},
@@ -167,15 +466,18 @@ class AIPrintMonPlugin(
         }
         return presets.get(preset_name)
 
-    def send_text_test_to_llm(self, endpoint=None, api_key=None, model=None, system_prompt=None, timeout=15):
+    def send_text_test_to_llm(self, endpoint=None, api_key=None, model=None, system_prompt=None, timeout=15, timings=None):
         """Send a short test text prompt to the configured endpoint to validate connectivity.
 
-        Returns (ok: bool, info: str)
+        Returns (ok: bool, info: str). If ``timings`` is a dict it is filled
+        with the latency breakdown in seconds.
         """
-        endpoint = endpoint or self.get_settings_defaults().get("api_endpoint")
-        model = model or self.get_settings_defaults().get("model")
-        api_key = api_key or self.get_settings_defaults().get("api_key")
-        system_prompt = system_prompt or self.get_settings_defaults().get("system_prompt")
+        timings = {} if timings is None else timings
+        config = self._config
+        endpoint = endpoint or config.api_endpoint
+        model = model or config.model
+        api_key = api_key or config.api_key
+        system_prompt = system_prompt or config.system_prompt
 
         if not endpoint:
             return False, "No endpoint configured"
@@ -189,19 +491,21 @@ class AIPrintMonPlugin(
             "n": 1,
         }
 
-        headers = {"Content-Type": "application/json"}
-        if api_key:
-            headers["Authorization"] = f"Bearer {api_key}"
+        headers = build_headers(api_key)
 
         try:
             t0 = time.time()
-            resp = requests.post(endpoint, headers=headers, data=json.dumps(payload), timeout=timeout)
+            resp = self._http.post(endpoint, headers=headers, data=json.dumps(payload), read_timeout=timeout)
             latency = time.time() - t0
+            timings["time_to_headers"] = resp.elapsed.total_seconds()
+            timings["llm"] = latency
             resp.raise_for_status()
             # Best-effort parse
             try:
                 j = resp.json()
+                t_parse = time.time()
                 parsed = self.parse_llm_response(j)
+                timings["parse"] = time.time() - t_parse
                 if parsed and parsed.get("status") == "ok":
                     return True, f"ok (latency {latency:.2f}s)"
                 # If parsed but not ok, still consider connection successful but note response
@@ -212,6 +516,79 @@ class AIPrintMonPlugin(
             logger.exception("Test connection failed")
             return False, str(e)
 
+    def start_test_job(self, endpoint, api_key, model, mode="text"):
+        """Start a connection test in the background; identical running tests are reused.
+
+        Returns (job, created). Progress and the result are pushed to the
+        frontend as plugin messages and can be polled via on_api_get.
+        """
+        key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+        job, created = self._jobs.start(
+            (mode, endpoint, model, key_hash), "test_connection", mode=mode, endpoint=endpoint, model=model
+        )
+        if created:
+            self._push_job(job)
+            self._engine.submit(self._run_test_job(job["id"], endpoint, api_key, model, mode), group="job")
+        return job, created
+
+    async def _run_test_job(self, job_id, endpoint, api_key, model, mode):
+        t0 = time.monotonic()
+        try:
+            if mode == "image":
+                ok, message, timings = await self._image_round_trip(job_id, endpoint, api_key, model)
+            else:
+                self._push_job(self._jobs.update(job_id, progress=0.5, message="waiting for model"))
+                timings = {}
+                ok, message = await self._engine.to_thread(
+                    self.send_text_test_to_llm, endpoint=endpoint, api_key=api_key, model=model, timings=timings
+                )
+            timings["total"] = time.monotonic() - t0
+            if ok:
+                logger.info("Test connection OK: %s", message)
+            else:
+                logger.warning("Test connection failed: %s", message)
+            self._push_job(self._jobs.finish(job_id, ok, message, {"timings": timings}))
+        except asyncio.CancelledError:
+            self._push_job(self._jobs.finish(job_id, False, "cancelled"))
+            raise
+        except Exception as e:
+            logger.exception("Test job %s failed", job_id)
+            self._push_job(self._jobs.finish(job_id, False, str(e)))
+
+    async def _image_round_trip(self, job_id, endpoint, api_key, model):
+        """Capture, preprocess and classify one real snapshot; returns (ok, message, timings)."""
+        timings = {}
+        self._push_job(self._jobs.update(job_id, progress=0.1, message="capturing snapshot"))
+        t = time.monotonic()
+        snapshot_url = self._config.snapshot_url
+        raw = await self._engine.to_thread(self.capture_snapshot, snapshot_url)
+        timings["capture"] = time.monotonic() - t
+        if raw is None:
+            return False, "could not capture a snapshot from %s" % snapshot_url, timings
+
+        t = time.monotonic()
+        img = await self._engine.to_thread(self.preprocess_snapshot, raw)
+        timings["preprocess"] = time.monotonic() - t
+        timings["image_bytes"] = len(img)
+
+        self._push_job(self._jobs.update(job_id, progress=0.4, message="waiting for model"))
+        t = time.monotonic()
+        resp = await self._engine.to_thread(self.send_image_to_llm, img, endpoint=endpoint, api_key=api_key, model=model)
+        timings["llm"] = time.monotonic() - t
+        if resp is None:
+            return False, "image request failed (see octoprint.log)", timings
+
+        t = time.monotonic()
+        parsed = self.parse_llm_response(resp)
+        timings["parse"] = time.monotonic() - t
+        if parsed is None:
+            return True, "connected, but the reply was not a verdict (latency %.2fs)" % timings["llm"], timings
+        return True, "image round trip ok, verdict %s (latency %.2fs)" % (parsed, timings["llm"]), timings
+
+    def _push_job(self, job):
+        if job is not None:
+            self._plugin_manager.send_plugin_message(self._identifier, {"type": "test_job", "job": job})
+
     # --- Event handling hooks ---------------------------------------------
     def on_event(self, event, payload):
         # Minimal event dispatcher matching OctoPrint event names from the plan
@@ -225,112 +602,402 @@ class AIPrintMonPlugin(
                 self._on_print_paused(payload)
             elif event == "PrintResumed":
                 self._on_print_resumed(payload)
+            elif event == "ZChange":
+                self._on_layer_event(self._layers.on_z((payload or {}).get("new")))
+            elif event == "DisplayLayerProgress_layerChanged":
+                self._on_layer_event(self._layers.on_layer((payload or {}).get("currentLayer")))
         except Exception:
             logger.exception("Error handling event %s", event)
 
     def _on_print_started(self, payload):
         logger.info("Print started — starting monitoring")
-        self.start_monitoring()
+        self._change_gate.reset()
+        self._print_started_at = time.monotonic()
+        self._ok_streak = 0
+        self._last_vote_suspicious = False
+        self._layers.reset()
+        name = (payload or {}).get("name") or (payload or {}).get("path") or "print"
+        self._current_print = {"id": "%s@%d" % ((payload or {}).get("path") or name, int(time.time())), "name": name}
+        if self._monitoring:
+            # Already running since startup: drop the idle countdown so the
+            # first check of the print uses the early-print interval
+            self._scheduler.stop()
+            self._scheduler.start()
+        else:
+            self.start_monitoring()
+        self._start_model_warmup()
 
     def _on_print_ended(self, payload):
         logger.info("Print ended — stopping monitoring and resetting state")
         self.stop_monitoring()
+        self._cancel_checks()
+        self._release_model()
+        self._change_gate.reset()
+        self._print_started_at = None
+        self._current_print = None
 
     def _on_print_paused(self, payload):
         logger.info("Print paused — pausing monitoring timer")
-        # In a full plugin we'd pause the internal timer; for now stop it.
-        self.stop_monitoring()
+        self._scheduler.pause()
+        self._cancel_checks()
+        self._stop_stream_reader()
 
     def _on_print_resumed(self, payload):
         logger.info("Print resumed — resuming monitoring timer")
-        self.start_monitoring()
+        if not self._monitoring:
+            self.start_monitoring()
+            return
+        if self._stream_reader is None:
+            self._start_stream_reader()
+        self._scheduler.resume()
+
+    def _on_layer_event(self, layer):
+        """Start a check on every Nth layer when layer triggering is enabled."""
+        if layer is None or self._trigger_mode != "layer" or not self._monitoring:
+            return
+        if layer % self._layer_every_n:
+            return
+        if self._last_alert is not None and time.monotonic() - self._last_alert < self._cooldown:
+            self._metrics.inc("layer_triggers_total", label_value="ignored")
+            return
+        # The delay lets the head travel away from the part before the frame is taken
+        if self._scheduler.trigger(delay=self._layer_capture_delay, min_gap=self._layer_min_interval):
+            logger.debug("Layer %d reached; check in %.1fs", layer, self._layer_capture_delay)
+            self._metrics.inc("layer_triggers_total", label_value="scheduled")
+        else:
+            self._metrics.inc("layer_triggers_total", label_value="ignored")
+
+    # --- Model warm-up / keep-alive -----------------------------------------
+    def _ollama_base_url(self, endpoint):
+        """Return the Ollama server root for ``endpoint``, or None if it is not an Ollama endpoint."""
+        parts = urllib.parse.urlsplit(endpoint or "")
+        if self._config.provider_preset == "Ollama" or parts.port == 11434:
+            return "%s://%s" % (parts.scheme, parts.netloc)
+        return None
+
+    def warm_up_model(self, keep_alive=None):
+        """Make sure the configured model is loaded; returns True on success.
+
+        For Ollama the native /api/generate call without a prompt loads the
+        model and sets how long it stays resident. Other providers get a
+        one-token chat request.
+        """
+        config = self._config
+        endpoint, model, headers = config.api_endpoint, config.model, config.headers
+        if not endpoint:
+            return False
+
+        base = self._ollama_base_url(endpoint)
+        if base is not None:
+            url = base + "/api/generate"
+            payload = {"model": model, "keep_alive": self._ollama_keep_alive if keep_alive is None else keep_alive}
+        else:
+            url = endpoint
+            payload = {"model": model, "messages": [{"role": "user", "content": "ok"}], "max_tokens": 1}
+
+        t0 = time.monotonic()
+        try:
+            # Loading a large vision model from disk can take a while
+            resp = self._http.post(url, headers=headers, data=json.dumps(payload), read_timeout=120)
+            resp.raise_for_status()
+        except Exception:
+            self._metrics.inc("errors_total", label_value="warmup")
+            logger.warning("Model warm-up request to %s failed", url, exc_info=True)
+            return False
+        elapsed = time.monotonic() - t0
+        self._metrics.observe("warmup_seconds", elapsed)
+        logger.info("Model %s warm-up/keep-alive took %.2fs", model, elapsed)
+        return True
+
+    def _start_model_warmup(self):
+        if self._engine is None:
+            return
+        self._engine.cancel_all(group="keepalive")
+        if self._warmup_on_start or self._keepalive_seconds:
+            self._engine.submit(self._keep_model_warm(), group="keepalive")
+
+    async def _keep_model_warm(self):
+        """Warm the model up now, then ping an Ollama endpoint periodically while monitoring."""
+        if self._warmup_on_start:
+            await self._engine.to_thread(self.warm_up_model)
+        if not self._keepalive_seconds or self._ollama_base_url(self._config.api_endpoint) is None:
+            # Keep-alive pings are free on Ollama but would cost tokens on a cloud provider
+            return
+        while self._monitoring:
+            await asyncio.sleep(self._keepalive_seconds)
+            if self._monitoring and not self._scheduler.paused:
+                await self._engine.to_thread(self.warm_up_model)
+
+    def _release_model(self):
+        if self._engine is None:
+            return
+        self._engine.cancel_all(group="keepalive")
+        if self._release_on_end and self._ollama_base_url(self._config.api_endpoint) is not None:
+            self._engine.submit(self._engine.to_thread(self.warm_up_model, keep_alive=0), group="release")
 
     # --- Monitoring timer management ----------------------------------------
     def start_monitoring(self):
         if self._monitoring:
             return
         self._monitoring = True
-        self._schedule_timer()
+        self._start_stream_reader()
+        self._scheduler.start()
         logger.info("Monitoring started")
 
     def stop_monitoring(self):
         self._monitoring = False
-        if self._timer:
-            self._timer.cancel()
-            self._timer = None
+        self._scheduler.stop()
+        self._stop_stream_reader()
         logger.info("Monitoring stopped")
 
-    def _schedule_timer(self):
-        if not self._monitoring:
+    def _start_stream_reader(self):
+        if not self._stream_enabled or self._http is None:
             return
-        interval = max(60, int(self._timer_interval))
-        self._timer = threading.Timer(interval, self._timer_tick)
-        self._timer.daemon = True
-        self._timer.start()
+        self._stream_reader = MjpegStreamReader(
+            self._http, self._stream_url, buffer_frames=self._stream_buffer_frames
+        )
+        self._stream_reader.start()
+
+    def _stop_stream_reader(self):
+        if self._stream_reader is not None:
+            self._stream_reader.stop()
+            self._stream_reader = None
+
+    def _cancel_checks(self):
+        if self._engine is not None:
+            self._engine.cancel_all(group="vote")
+
+    def _next_check_interval(self):
+        """Seconds until the next check: adapted to recent verdicts and never inside the cooldown.
+
+        In layer mode this is only the wall-clock fallback for when no layer
+        events arrive, e.g. during a long layer or with a firmware that
+        reports no Z moves.
+        """
+        if self._trigger_mode == "layer":
+            # Without a fallback, wait a day; a layer trigger ends the wait early
+            interval = self._layer_fallback or 86400.0
+        else:
+            interval = float(self._timer_interval)
+        a = self._adaptive
+        if a["enabled"]:
+            now = time.monotonic()
+            if self._last_vote_suspicious:
+                interval *= a["suspicious_factor"]
+            elif self._print_started_at is not None and now - self._print_started_at < a["early_seconds"]:
+                # First layers are where most failures happen
+                interval *= a["early_factor"]
+            elif a["relax_after"] > 0 and self._ok_streak >= a["relax_after"]:
+                interval *= a["relax_factor"]
+        interval = max(60.0, interval)
+
+        if self._last_alert is not None:
+            cooldown_left = self._cooldown - (time.monotonic() - self._last_alert)
+            interval = max(interval, cooldown_left)
+        return interval
 
     def _timer_tick(self):
         try:
             self.run_voting_sequence()
             self._consecutive_errors = 0  # Reset on success
+        except concurrent.futures.CancelledError:
+            logger.info("Voting sequence cancelled")
         except Exception:
             self._consecutive_errors += 1
+            self._metrics.inc("errors_total", label_value="vote")
             logger.exception("Error during voting sequence (consecutive: %d)", self._consecutive_errors)
             
-            if self._consecutive_errors >= 3:
-                logger.error("Too many consecutive errors. Disabling monitoring.")
-                self.stop_monitoring()
-                self._event_bus.fire("plugin_ai_printmon_error", {"message": "Monitoring disabled after 3 consecutive errors"})
-        finally:
-            # Reschedule
-            if self._monitoring:
-                self._schedule_timer()
+            # Keep checking: endpoint failover and circuit breakers handle flaky
+            # LLM backends, so only tell the user once per error streak
+            if self._consecutive_errors == 3:
+                logger.error("Three consecutive voting errors; monitoring continues at the normal interval")
+                self._event_bus.fire("plugin_ai_printmon_error", {"message": "3 consecutive monitoring errors"})
 
     # --- Snapshot capture ---------------------------------------------------
     def capture_snapshot(self, snapshot_url):
+        t0 = time.monotonic()
+        reader = self._stream_reader
+        if reader is not None:
+            latest = reader.latest(max_age=self._stream_max_frame_age)
+            if latest is not None:
+                self._metrics.observe("capture_seconds", time.monotonic() - t0)
+                self._metrics.inc("snapshot_bytes_total", len(latest[1]))
+                return latest[1]
+            logger.debug("No fresh MJPEG frame buffered; falling back to snapshot URL")
         try:
-            resp = requests.get(snapshot_url, timeout=10)
+            resp = self._http.get(snapshot_url, read_timeout=10)
             resp.raise_for_status()
-            return resp.content
+            content = resp.content
         except Exception:
+            self._metrics.inc("errors_total", label_value="capture")
             logger.exception("Failed to capture snapshot from %s", snapshot_url)
             return None
+        self._metrics.observe("capture_seconds", time.monotonic() - t0)
+        self._metrics.inc("snapshot_bytes_total", len(content))
+        return content
+
+    def preprocess_snapshot(self, img_bytes):
+        """Crop/downscale/re-encode a captured frame per the preprocess_* settings."""
+        if img_bytes is None or not self._preprocess["enabled"]:
+            return img_bytes
+        data, info = imaging.preprocess_snapshot(
+            img_bytes,
+            roi=self._preprocess["roi"],
+            max_edge=self._preprocess["max_edge"],
+            quality=self._preprocess["quality"],
+            grayscale=self._preprocess["grayscale"],
+        )
+        self._last_frame_info = info
+        self._metrics.observe("preprocess_seconds", info["seconds"])
+        logger.debug(
+            "Preprocessed snapshot: %d -> %d bytes in %.1f ms",
+            info["input_bytes"], info["output_bytes"], info["seconds"] * 1000.0,
+        )
+        return data
 
     # --- LLM client ---------------------------------------------------------
-    def send_image_to_llm(self, img_bytes, system_prompt=None):
+    def send_image_to_llm(self, img_bytes, system_prompt=None, endpoint=None, api_key=None, model=None):
+        """Ask for a verdict on one frame; returns the raw response JSON or None.
+
+        With an explicit ``endpoint`` only that endpoint is asked and any
+        reply is returned, so a connection test can tell an unreachable
+        endpoint from one that answers without a verdict. Otherwise the
+        configured endpoints are tried in order, with circuit breakers and
+        optional hedging, until one returns a parseable verdict.
+        """
         if img_bytes is None:
             return None
-        endpoint = self.get_settings_defaults()["api_endpoint"]
-        model = self.get_settings_defaults()["model"]
-        api_key = self.get_settings_defaults()["api_key"]
 
+        t_encode = time.monotonic()
         b64 = base64.b64encode(img_bytes).decode("ascii")
         data_url = f"data:image/jpeg;base64,{b64}"
+        b64_seconds = time.monotonic() - t_encode
+        config = self._config
+
+        def attempt(ep, require_verdict=True):
+            t_body = time.monotonic()
+            body = config.verdict_body(ep.model, data_url, system_prompt)
+            self._metrics.observe("encode_seconds", b64_seconds + time.monotonic() - t_body)
+
+            if config.llm_stream:
+                resp, t0 = self._post_llm(ep.url, ep.headers, body, stream=True)
+                try:
+                    resp.raise_for_status()
+                except Exception:
+                    resp.close()
+                    raise
+                result = read_streamed_completion(resp, collect_reason=config.llm_stream_collect_reason)
+            else:
+                resp, t0 = self._post_llm(ep.url, ep.headers, body)
+                resp.raise_for_status()
+                result = resp.json()
+            self._metrics.observe("llm_response_seconds", time.monotonic() - t0)
+            if not require_verdict:
+                return result
+            parsed = self.parse_llm_response(result)
+            if not isinstance(parsed, dict) or "status" not in parsed:
+                # An unusable answer counts against the endpoint so the next one is asked
+                raise ValueError("no verdict in response")
+            return result
+
+        try:
+            if endpoint:
+                return attempt(Endpoint(endpoint, model or config.model, api_key), require_verdict=False)
+            return self._endpoints.call(attempt)
+        except NoEndpointAvailable as exc:
+            self._metrics.inc("errors_total", label_value="llm")
+            logger.error("No LLM endpoint produced a verdict: %s", exc)
+            return None
+        except Exception:
+            self._metrics.inc("errors_total", label_value="llm")
+            logger.exception("LLM request failed")
+            return None
+
+    def _post_llm(self, endpoint, headers, body, **kwargs):
+        """POST an encoded body to the LLM endpoint; returns (response, start time) and records size/latency."""
+        self._metrics.inc("llm_requests_total")
+        self._metrics.inc("llm_payload_bytes_total", len(body))
+        if len(self._endpoints.endpoints) > 1:
+            # A refused connection should fail over at once, not after backoff
+            kwargs.setdefault("connect_retries", 0)
+        t0 = time.monotonic()
+        resp = self._http.post(endpoint, headers=headers, data=body, **kwargs)
+        # elapsed stops when headers arrive: upload, queueing and, unless streamed, generation
+        self._metrics.observe("llm_time_to_headers_seconds", resp.elapsed.total_seconds())
+        return resp, t0
+
+    def send_images_to_llm(self, images, system_prompt=None):
+        """Send several frames as image parts of a single chat-completions request.
+
+        Returns (resp_json, status_code); resp_json is None on failure and
+        status_code is None if no HTTP response was received at all. Endpoints
+        that rejected multi-image input before are skipped; one that rejects
+        it now is remembered until settings change.
+        """
+        config = self._config
+        t_encode = time.monotonic()
+        content = [{"type": "text", "text": MULTI_FRAME_INSTRUCTION.format(count=len(images))}]
+        for img_bytes in images:
+            b64 = base64.b64encode(img_bytes).decode("ascii")
+            content.append({"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}})
 
         payload = {
-            "model": model,
+            "model": MODEL_PLACEHOLDER,
             "messages": [
-                {"role": "system", "content": system_prompt or self.get_settings_defaults()["system_prompt"]},
-                {"role": "user", "content": "<image>"},
+                {"role": "system", "content": system_prompt or config.system_prompt},
+                {"role": "user", "content": content},
             ],
             "n": 1,
         }
+        config.apply_output_options(
+            payload,
+            {
+                "type": "object",
+                "properties": {"frames": {"type": "array", "items": VERDICT_SCHEMA}},
+                "required": ["frames"],
+            },
+            scale=len(images),
+        )
+        # Serialize the frames once; each endpoint attempt only swaps in its model
+        body = json.dumps(payload)
+        self._metrics.observe("encode_seconds", time.monotonic() - t_encode)
 
-        files = None
-        headers = {"Content-Type": "application/json"}
-        if api_key:
-            headers["Authorization"] = f"Bearer {api_key}"
-
-        # Many providers accept images inline in the message content. We'll append
-        # the data URL to the user content to keep this simple and provider-agnostic.
-        payload["messages"][1]["content"] = data_url
+        def attempt(ep):
+            resp, t0 = self._post_llm(
+                ep.url, ep.headers, body.replace(json.dumps(MODEL_PLACEHOLDER), json.dumps(ep.model), 1)
+            )
+            self._metrics.observe("llm_response_seconds", time.monotonic() - t0)
+            if resp.status_code in MULTI_FRAME_REJECT_STATUS:
+                # The endpoint is healthy, it just does not take several images
+                logger.warning(
+                    "Endpoint %s rejected multi-image input (HTTP %s); using per-frame requests for it from now on",
+                    ep.name,
+                    resp.status_code,
+                )
+                self._multi_frame_unsupported.add(ep.key)
+                return None, resp.status_code
+            resp.raise_for_status()
+            return resp.json(), resp.status_code
 
         try:
-            resp = requests.post(endpoint, headers=headers, data=json.dumps(payload), timeout=30)
-            resp.raise_for_status()
-            return resp.json()
+            result, status_code = self._endpoints.call(attempt, skip=lambda ep: ep.key in self._multi_frame_unsupported)
         except Exception:
-            logger.exception("LLM request failed")
+            self._metrics.inc("errors_total", label_value="llm")
+            logger.exception("Multi-frame LLM request failed")
+            return None, None
+        if result is None:
+            self._metrics.inc("errors_total", label_value="llm")
+        return result, status_code
+
+    def parse_multi_frame_response(self, resp_json, count):
+        """Return one parsed verdict per frame, or None if the reply does not match ``count`` frames."""
+        parsed = self.parse_llm_response(resp_json)
+        frames = parsed.get("frames") if isinstance(parsed, dict) else parsed
+        if not isinstance(frames, list) or len(frames) != count:
+            return None
+        if not all(isinstance(f, dict) and "status" in f for f in frames):
             return None
+        return frames
 
     def parse_llm_response(self, resp_json):
         """Extract the JSON object the system prompt required.
@@ -368,60 +1035,316 @@ class AIPrintMonPlugin(
         return None
 
     # --- Voting & actions --------------------------------------------------
+    def query_verdict(self, img_bytes):
+        """Return (parsed_verdict, source) for a frame, consulting the verdict cache first.
+
+        ``source`` is "cache" or "llm". Only "ok" verdicts are cached: a fail
+        vote always comes from a fresh model call, and an inconclusive answer
+        is never stored, so the cache can save calls but never escalate.
+        """
+        if img_bytes is None:
+            return None, "llm"
+        img_hash = context = None
+        if self._verdict_cache_enabled:
+            config = self._config
+            img_hash = perceptual_hash(img_bytes)
+            context = (config.model, config.system_prompt)
+            cached = self._verdict_cache.get(img_hash, context)
+            if cached is not None:
+                logger.debug("Verdict cache hit: %s", cached)
+                return cached, "cache"
+
+        resp = self.send_image_to_llm(img_bytes)
+        t0 = time.monotonic()
+        parsed = self.parse_llm_response(resp)
+        self._metrics.observe("parse_seconds", time.monotonic() - t0)
+        if img_hash is not None and isinstance(parsed, dict) and parsed.get("status") == "ok":
+            self._verdict_cache.put(img_hash, context, parsed)
+        return parsed, "llm"
+
     def run_voting_sequence(self):
-        settings = self.get_settings_defaults()
-        rounds = int(settings.get("rounds", 3))
-        round_delay = int(settings.get("round_delay", 3))
-        snapshot_url = settings.get("snapshot_url")
+        """Run one voting sequence on the check engine and block until it finishes.
 
+        Raises concurrent.futures.CancelledError if the vote is cancelled
+        (print ended or paused) before it completes.
+        """
+        return self._engine.run(self._vote(), group="vote")
+
+    async def _vote(self):
+        # One config for the whole sequence, even if settings are saved mid-vote
+        config = self._config
+
+        t0 = time.monotonic()
+        try:
+            if config.voting_mode == "pipelined":
+                await self._pipelined_vote(config, t0)
+            elif config.voting_mode == "multi_frame" and config.rounds > 1:
+                await self._multi_frame_vote(config, t0)
+            else:
+                await self._sequential_vote(config, t0)
+        finally:
+            self._metrics.observe("vote_seconds", time.monotonic() - t0)
+
+    async def _capture(self, snapshot_url):
+        return await self._engine.to_thread(
+            lambda: self.preprocess_snapshot(self.capture_snapshot(snapshot_url))
+        )
+
+    async def _sequential_vote(self, config, started):
+        rounds, round_delay, snapshot_url = config.rounds, config.round_delay, config.snapshot_url
         votes = []
+        details = []
+        first_sig = None
         for r in range(rounds):
-            img = self.capture_snapshot(snapshot_url)
-            resp = self.send_image_to_llm(img)
-            parsed = self.parse_llm_response(resp)
-            if parsed is None:
-                # Treat as inconclusive (do not count as fail)
-                votes.append("inconclusive")
-            else:
-                status = parsed.get("status")
-                votes.append("fail" if status == "fail" else "ok")
-
-            # Short-circuit: determine if further rounds can change outcome
-            fails = votes.count("fail")
-            remaining = rounds - (r + 1)
-            max_possible_fails = fails + remaining
-            # Evaluate against configured rules (simple default behaviour)
-            action = self.evaluate_rules(fails, rounds)
-            if action != "none":
-                self.execute_action(action, votes=votes, last_response=parsed)
+            img = await self._capture(snapshot_url)
+            if r == 0:
+                unchanged, first_sig = await self._engine.to_thread(self._frame_unchanged, img)
+                if unchanged:
+                    return
+            t_query = time.monotonic()
+            parsed, source = await self._engine.to_thread(self.query_verdict, img)
+            self._record_vote(votes, details, parsed, source, time.monotonic() - t_query)
+
+            if await self._finish_vote(config, started, votes, details, parsed, first_sig, img):
                 return
 
-            # If no future action is possible, stop early
-            # (Example: if even max_possible_fails can't reach lowest threshold)
-            # For simplicity here, if no fails so far and remaining cannot reach 1, stop.
-            if max_possible_fails == 0:
+            await asyncio.sleep(round_delay)
+
+    async def _pipelined_vote(self, config, started):
+        """Capture on the round_delay cadence while earlier rounds' LLM calls are still running.
+
+        Votes are tallied in completion order and the same early-exit rules as
+        the sequential path apply as soon as enough votes are in. Outstanding
+        requests are cancelled once the outcome is decided.
+        """
+        rounds, round_delay, snapshot_url = config.rounds, config.round_delay, config.snapshot_url
+        results = asyncio.Queue()
+        queries = []
+        unchanged_marker = object()
+        state = {"first_sig": None}
+
+        async def query(img):
+            t_query = time.monotonic()
+            parsed, source = await self._engine.to_thread(self.query_verdict, img)
+            return parsed, source, img, time.monotonic() - t_query
+
+        async def produce():
+            try:
+                for r in range(rounds):
+                    started = time.monotonic()
+                    img = await self._capture(snapshot_url)
+                    if r == 0:
+                        unchanged, state["first_sig"] = await self._engine.to_thread(self._frame_unchanged, img)
+                        if unchanged:
+                            results.put_nowait(unchanged_marker)
+                            return
+                    task = asyncio.ensure_future(query(img))
+                    task.add_done_callback(results.put_nowait)
+                    queries.append(task)
+                    if r + 1 < rounds:
+                        await asyncio.sleep(max(0.0, started + round_delay - time.monotonic()))
+            except Exception as exc:
+                results.put_nowait(exc)
+
+        producer = asyncio.ensure_future(produce())
+        votes = []
+        details = []
+        try:
+            while len(votes) < rounds:
+                item = await results.get()
+                if item is unchanged_marker:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                if item.cancelled():
+                    continue
+                parsed, source, img, seconds = item.result()
+                self._record_vote(votes, details, parsed, source, seconds)
+                if await self._finish_vote(config, started, votes, details, parsed, state["first_sig"], img):
+                    return
+        finally:
+            producer.cancel()
+            for task in queries:
+                task.cancel()
+
+    async def _multi_frame_vote(self, config, started):
+        """Capture every round first, then ask for all verdicts in one request.
+
+        Falls back to one request per frame if the provider rejects the
+        multi-image request or the reply does not contain one verdict per
+        frame. A provider that rejects it outright is remembered and not
+        asked again until settings change.
+        """
+        rounds, round_delay, snapshot_url = config.rounds, config.round_delay, config.snapshot_url
+        images = []
+        first_sig = None
+        for r in range(rounds):
+            if r:
+                await asyncio.sleep(round_delay)
+            img = await self._capture(snapshot_url)
+            if r == 0:
+                unchanged, first_sig = await self._engine.to_thread(self._frame_unchanged, img)
+                if unchanged:
+                    return
+            images.append(img)
+
+        verdicts = None
+        captured = [img for img in images if img is not None]
+        if captured and any(ep.key not in self._multi_frame_unsupported for ep in self._endpoints.endpoints):
+            t_query = time.monotonic()
+            resp, status_code = await self._engine.to_thread(self.send_images_to_llm, captured)
+            batch_seconds = time.monotonic() - t_query
+            frames = self.parse_multi_frame_response(resp, len(captured)) if resp is not None else None
+            if frames is not None:
+                it = iter(frames)
+                # Frames that failed to capture stay inconclusive, as in the per-frame path
+                verdicts = [next(it) if img is not None else None for img in images]
+            elif status_code is not None:
+                logger.info("Multi-frame reply unusable; falling back to per-frame requests")
+
+        votes = []
+        details = []
+        for i, img in enumerate(images):
+            if verdicts is not None:
+                parsed, source, seconds = verdicts[i], "llm_batch", batch_seconds
+            else:
+                t_query = time.monotonic()
+                parsed, source = await self._engine.to_thread(self.query_verdict, img)
+                seconds = time.monotonic() - t_query
+            self._record_vote(votes, details, parsed, source, seconds)
+            if await self._finish_vote(config, started, votes, details, parsed, first_sig, img):
                 return
 
-            time.sleep(round_delay)
+    def _frame_unchanged(self, img):
+        """Return (unchanged, signature) for the first frame of a vote via the change gate."""
+        if not self._change_gate_enabled:
+            return False, None
+        # Skip the LLM entirely if the scene matches the last verified-ok frame
+        sig = self._change_gate.signature(img)
+        unchanged, info = self._change_gate.is_unchanged(sig)
+        if unchanged:
+            logger.info("Frame unchanged since last ok check (%s); reusing previous verdict", info)
+            self._metrics.inc("skipped_checks_total", label_value="unchanged")
+            self._ok_streak += 1
+            self._last_vote_suspicious = False
+        return unchanged, sig
+
+    def _record_vote(self, votes, details, parsed, source, seconds):
+        if parsed is None:
+            # Treat as inconclusive (do not count as fail)
+            votes.append("inconclusive")
+        else:
+            status = parsed.get("status")
+            votes.append("fail" if status == "fail" else "ok")
+        details.append(
+            {
+                "verdict": votes[-1],
+                "reason": parsed.get("reason") if isinstance(parsed, dict) else None,
+                "source": source,
+                "seconds": round(seconds, 3),
+            }
+        )
+        self._metrics.inc("votes_total", label_value=votes[-1])
+
+    async def _finish_vote(self, config, started, votes, details, parsed, first_sig, frame):
+        """Apply the rules to the votes so far; return True once the sequence is decided.
+
+        The sequence stops as soon as no outcome of the remaining rounds can
+        change the action, e.g. two passes out of three under the default
+        rules, so no capture or LLM call is spent on a vote that cannot matter.
+        """
+        action = config.rule_table.decide(votes.count("fail"), len(votes), config.rounds)
+        if action is None:
+            return False
+
+        self._note_vote_outcome(votes)
+        if action == "none" and votes.count("ok") == len(votes):
+            self._change_gate.mark_ok(first_sig)
+        # Once started, recording and acting run to completion even if the vote
+        # is cancelled, which is exactly what happens when the action cancels the print
+        await asyncio.shield(
+            self._engine.to_thread(
+                self._conclude_vote, action, list(votes), list(details), parsed, frame, time.monotonic() - started
+            )
+        )
+        return True
+
+    def _conclude_vote(self, action, votes, details, parsed, frame, seconds):
+        self._record_history(action, votes, details, frame, seconds)
+        if action != "none" or "fail" in votes:
+            if not (isinstance(parsed, dict) and parsed.get("status") == "fail"):
+                # The deciding vote can be an ok; report the most recent fail instead
+                fails = [d for d in details if d["verdict"] == "fail"]
+                if fails:
+                    parsed = {"status": "fail", "reason": fails[-1]["reason"]}
+            self.execute_action(action, votes=votes, last_response=parsed, vote_sources=[d["source"] for d in details])
+
+    def _record_history(self, action, votes, details, frame, seconds):
+        history = self._history
+        if history is None:
+            return
+        try:
+            fail_reasons = [d["reason"] for d in details if d["verdict"] == "fail" and d["reason"]]
+            thumb = None
+            if self._history_thumbnail_edge > 0:
+                thumb = imaging.thumbnail(frame, max_edge=self._history_thumbnail_edge)
+            current = self._current_print or {}
+            history.add(
+                action,
+                votes,
+                details,
+                reason=fail_reasons[-1] if fail_reasons else None,
+                seconds=round(seconds, 3),
+                print_id=current.get("id"),
+                print_name=current.get("name"),
+                thumbnail=thumb,
+            )
+        except Exception:
+            logger.exception("Could not record vote in history")
+
+    def _create_metrics(self):
+        m = MetricsRegistry()
+        m.histogram("capture_seconds", "Time to obtain a snapshot (HTTP or buffered MJPEG frame)")
+        m.histogram("preprocess_seconds", "Time spent cropping, scaling and re-encoding a snapshot")
+        m.histogram("encode_seconds", "Time spent base64-encoding and serializing an LLM request")
+        m.histogram("llm_time_to_headers_seconds", "Time from sending an LLM request until response headers arrive")
+        m.histogram("llm_response_seconds", "Total LLM request time including reading the body")
+        m.histogram("parse_seconds", "Time spent parsing an LLM response")
+        m.histogram("vote_seconds", "Duration of a full voting sequence")
+        m.histogram("warmup_seconds", "Duration of model warm-up and keep-alive requests")
+        m.counter("llm_requests_total", "LLM requests sent")
+        m.counter("llm_payload_bytes_total", "Request body bytes sent to the LLM")
+        m.counter("snapshot_bytes_total", "Snapshot bytes captured before preprocessing")
+        m.counter("votes_total", "Votes recorded by verdict", label="verdict")
+        m.counter("skipped_checks_total", "Checks skipped without an LLM call", label="reason")
+        m.counter("layer_triggers_total", "Layer changes that scheduled a check or were ignored", label="result")
+        m.counter("errors_total", "Errors by stage", label="stage")
+        m.counter("actions_total", "Actions executed", label="action")
+        return m
+
+    def _note_vote_outcome(self, votes):
+        """Feed a finished vote into the adaptive interval."""
+        if votes.count("ok") == len(votes):
+            self._ok_streak += 1
+        else:
+            self._ok_streak = 0
+        self._last_vote_suspicious = "fail" in votes
 
     def evaluate_rules(self, fail_count, rounds):
-        # Minimal rule evaluation: escalate at 1/3, 2/3, 3/3 per defaults
-        if rounds <= 0:
-            return "none"
-        if fail_count == 0:
-            return "none"
-        if fail_count >= rounds:
-            return "cancel_stop_queue"
-        if fail_count * 2 >= rounds:
-            return "warn"
-        return "none"
-
-    def execute_action(self, action, votes=None, last_response=None):
-        logger.info("Executing action %s (votes=%s)", action, votes)
+        """Action the configured failure rules assign to ``fail_count`` fails out of ``rounds``."""
+        return self._config.rule_table.action(fail_count, rounds)
+
+    def execute_action(self, action, votes=None, last_response=None, vote_sources=None):
+        logger.info("Executing action %s (votes=%s sources=%s)", action, votes, vote_sources)
+        self._metrics.inc("actions_total", label_value=action)
+        if action in ("warn", "pause", "cancel", "cancel_stop_queue"):
+            # Start the cooldown; the scheduler will not run another check until it has passed
+            self._last_alert = time.monotonic()
         
         payload = {
             "action": action,
             "votes": votes,
+            "vote_sources": vote_sources,
             "reason": last_response.get("reason") if last_response else "Unknown",
             "timestamp": time.time()
         }
@@ -468,7 +1391,8 @@ class AIPrintMonPlugin(
             headers["X-Api-Key"] = api_key
             
         try:
-            resp = requests.post(url, headers=headers, json={"active": False}, timeout=5)
+            # Without Continuous Print nothing listens here; do not delay the cancel with retries
+            resp = self._http.post(url, headers=headers, json={"active": False}, read_timeout=5, retries=0)
             resp.raise_for_status()
             logger.info("Continuous Print queue stopped successfully")
         except Exception:
@@ -0,0 +1,74 @@
+"""Cheap local detector that tells whether a frame differs from the last verified-ok one."""
+import io
+import logging
+import time
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # NumPy and Pillow are optional; the gate then never skips a check
+    np = None
+    Image = None
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+
+def change_gate_available():
+    return np is not None and Image is not None
+
+
+class FrameChangeGate(object):
+    """Compares downsampled grayscale signatures against the last frame the LLM judged ok.
+
+    A frame is "unchanged" when both the mean absolute difference and the
+    fraction of noticeably changed cells stay below their thresholds. The
+    reference expires after ``max_age`` seconds so a recheck is forced even
+    on a perfectly static scene.
+    """
+
+    def __init__(self, size=32, mean_threshold=4.0, pixel_delta=24, changed_fraction=0.01, max_age=1800):
+        self.size = int(size)
+        self.mean_threshold = float(mean_threshold)
+        self.pixel_delta = float(pixel_delta)
+        self.changed_fraction = float(changed_fraction)
+        self.max_age = float(max_age)
+        self._reference = None
+        self._reference_time = 0.0
+
+    def signature(self, img_bytes):
+        """Return a small float32 grayscale array for ``img_bytes``, or None if it cannot be decoded."""
+        if img_bytes is None or not change_gate_available():
+            return None
+        try:
+            im = Image.open(io.BytesIO(img_bytes))
+            im.draft("L", (self.size * 4, self.size * 4))
+            im = im.convert("L").resize((self.size, self.size), Image.BILINEAR)
+            return np.asarray(im, dtype=np.float32)
+        except Exception:
+            logger.exception("Could not compute frame signature")
+            return None
+
+    def is_unchanged(self, sig, now=None):
+        """Return (unchanged, info) for a signature against the stored ok reference."""
+        now = time.monotonic() if now is None else now
+        if sig is None or self._reference is None:
+            return False, {"reason": "no reference"}
+        age = now - self._reference_time
+        if age > self.max_age:
+            return False, {"reason": "reference expired", "age": age}
+        diff = np.abs(sig - self._reference)
+        mean_diff = float(diff.mean())
+        changed = float((diff > self.pixel_delta).mean())
+        info = {"mean_diff": mean_diff, "changed_fraction": changed, "age": age}
+        return mean_diff <= self.mean_threshold and changed <= self.changed_fraction, info
+
+    def mark_ok(self, sig, now=None):
+        """Remember ``sig`` as the latest frame the LLM verified as ok."""
+        if sig is None:
+            return
+        self._reference = sig
+        self._reference_time = time.monotonic() if now is None else now
+
+    def reset(self):
+        self._reference = None
+        self._reference_time = 0.0
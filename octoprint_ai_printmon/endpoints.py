@@ -0,0 +1,233 @@
+"""Ordered LLM endpoints with per-endpoint circuit breakers, failover and hedged requests."""
+import collections
+import concurrent.futures
+import logging
+import threading
+import time
+import urllib.parse
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+
+def build_headers(api_key):
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    return headers
+
+
+class NoEndpointAvailable(Exception):
+    """Raised when every endpoint failed or is shut off by its circuit breaker."""
+
+
+class CircuitBreaker(object):
+    """Classic closed/open/half-open breaker.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds. It then lets exactly one
+    probe through (half-open); the probe's outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=120.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """Count a failure; returns True if this opened the breaker."""
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+
+class Endpoint(object):
+    """One OpenAI-compatible endpoint with its own model, key, breaker and latency window."""
+
+    def __init__(self, url, model, api_key="", name=None, breaker=None, window=50):
+        self.url = url
+        self.model = model
+        self.api_key = api_key or ""
+        self.headers = build_headers(self.api_key)
+        self.name = name or urllib.parse.urlsplit(url).netloc or url
+        self.breaker = breaker or CircuitBreaker()
+        self._latencies = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @property
+    def key(self):
+        return (self.url, self.model)
+
+    def observe(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def p95(self, min_samples=5):
+        """Observed p95 latency of successful calls, or None with fewer than ``min_samples``."""
+        with self._lock:
+            ordered = sorted(self._latencies)
+        if len(ordered) < max(1, min_samples):
+            return None
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+
+class EndpointPool(object):
+    """Calls the first healthy endpoint, failing over down the list.
+
+    ``fn(endpoint)`` must return a valid result or raise; any exception counts
+    as a failure for that endpoint's breaker and moves on to the next one.
+    With ``hedge`` enabled, a call still running after the endpoint's
+    observed p95 latency is raced against the next endpoint and the first
+    valid result wins. The loser keeps running in the background only to
+    update its breaker and latency window.
+    """
+
+    def __init__(self, endpoints, hedge=False, hedge_min_samples=5, workers=4):
+        self.endpoints = list(endpoints)
+        self.hedge = bool(hedge) and len(self.endpoints) > 1
+        self.hedge_min_samples = int(hedge_min_samples)
+        self._workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "failovers": 0, "hedges": 0, "hedge_wins": 0, "breaker_opens": 0, "unavailable": 0}
+
+    def call(self, fn, skip=None):
+        with self._lock:
+            self._stats["calls"] += 1
+        candidates = [ep for ep in self.endpoints if skip is None or not skip(ep)]
+        if self.hedge:
+            return self._call_hedged(fn, candidates)
+
+        errors = []
+        for ep in candidates:
+            if not ep.breaker.allow():
+                continue
+            if ep is not candidates[0]:
+                self._count("failovers")
+            try:
+                return self._attempt(ep, fn)
+            except Exception as exc:
+                errors.append("%s: %s" % (ep.name, exc))
+        self._count("unavailable")
+        raise NoEndpointAvailable("; ".join(errors) or "all circuit breakers open")
+
+    def _call_hedged(self, fn, candidates):
+        remaining = iter(candidates)
+        pending = {}
+        errors = []
+
+        def launch():
+            for ep in remaining:
+                if ep.breaker.allow():
+                    pending[self._get_executor().submit(self._attempt, ep, fn)] = ep
+                    p95 = ep.p95(self.hedge_min_samples)
+                    return time.monotonic() + p95 if p95 is not None else None
+            return False
+
+        hedge_at = launch()
+        while pending:
+            timeout = None if not hedge_at else max(0.0, hedge_at - time.monotonic())
+            done, _ = concurrent.futures.wait(pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+            if not done:
+                slow = list(pending.values())[-1]
+                hedge_at = launch()
+                if hedge_at is not False:
+                    self._count("hedges")
+                    logger.info("LLM endpoint %s exceeded its p95 latency; hedging to the next endpoint", slow.name)
+                else:
+                    hedge_at = None
+                continue
+            for future in done:
+                ep = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    errors.append("%s: %s" % (ep.name, exc))
+                    continue
+                if ep is not candidates[0]:
+                    self._count("hedge_wins" if pending else "failovers")
+                return result
+            if not pending:
+                hedge_at = launch()
+                if hedge_at is False:
+                    break
+        self._count("unavailable")
+        raise NoEndpointAvailable("; ".join(errors) or "all circuit breakers open")
+
+    def _attempt(self, ep, fn):
+        t0 = time.monotonic()
+        try:
+            result = fn(ep)
+        except Exception as exc:
+            if ep.breaker.record_failure():
+                self._count("breaker_opens")
+                logger.warning(
+                    "Circuit breaker for LLM endpoint %s opened after %d failure(s): %s", ep.name, ep.breaker.failures, exc
+                )
+            else:
+                logger.warning("LLM endpoint %s failed: %s", ep.name, exc)
+            raise
+        ep.observe(time.monotonic() - t0)
+        ep.breaker.record_success()
+        return result
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._workers, thread_name_prefix="ai_printmon_llm"
+                )
+            return self._executor
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+        out["endpoints"] = [
+            {
+                "name": ep.name,
+                "model": ep.model,
+                "state": ep.breaker.state,
+                "failures": ep.breaker.failures,
+                "p95_seconds": ep.p95(self.hedge_min_samples),
+            }
+            for ep in self.endpoints
+        ]
+        return out
@@ -0,0 +1,105 @@
+"""Asyncio engine that runs monitoring checks as cancellable tasks on its own loop thread."""
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import threading
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+
+class CheckEngine(object):
+    """Owns an event loop thread plus a bounded pool for blocking snapshot/LLM I/O.
+
+    Checks are coroutines submitted from any thread, optionally tagged with a
+    group. ``cancel_all`` cancels in-flight work (of one group or all) at its
+    current await point, so a vote never acts after the print has ended. A
+    blocking request that was already on the wire finishes in the pool and its
+    result is discarded.
+    """
+
+    def __init__(self, workers=4):
+        self._workers = max(1, int(workers))
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._loop is not None
+
+    def start(self):
+        if self._loop is not None:
+            return
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix="ai_printmon_io"
+        )
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(self._executor)
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            try:
+                loop.run_forever()
+                # Let cancelled checks unwind their finally blocks before closing
+                pending = asyncio.all_tasks(loop)
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            finally:
+                loop.close()
+
+        self._loop = loop
+        self._thread = threading.Thread(target=run, name="ai_printmon_engine", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self):
+        if self._loop is None:
+            return
+        self.cancel_all()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+        self._loop = self._thread = self._executor = None
+
+    def submit(self, coro, group=None):
+        """Schedule ``coro`` on the engine loop; returns a concurrent.futures.Future."""
+        if self._loop is None:
+            coro.close()
+            raise RuntimeError("Check engine is not running")
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        with self._lock:
+            self._futures[future] = group
+        future.add_done_callback(self._discard)
+        return future
+
+    def run(self, coro, timeout=None, group=None):
+        """Run ``coro`` on the engine and block for its result.
+
+        Raises concurrent.futures.CancelledError if it was cancelled.
+        """
+        return self.submit(coro, group=group).result(timeout)
+
+    def cancel_all(self, group=None):
+        """Cancel unfinished work in ``group`` (every group if None); returns how many."""
+        with self._lock:
+            futures = [f for f, g in self._futures.items() if group is None or g == group]
+        cancelled = sum(1 for f in futures if not f.done() and f.cancel())
+        if cancelled:
+            logger.info("Cancelled %d in-flight check(s)", cancelled)
+        return cancelled
+
+    async def to_thread(self, fn, *args, **kwargs):
+        """Await a blocking call on the engine's I/O pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def _discard(self, future):
+        with self._lock:
+            self._futures.pop(future, None)
@@ -0,0 +1,151 @@
+"""Bounded on-disk history of voting sequences, with small thumbnails, kept in SQLite."""
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS checks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        print_id TEXT,
+        print_name TEXT,
+        ts REAL NOT NULL,
+        action TEXT NOT NULL,
+        votes TEXT NOT NULL,
+        rounds TEXT NOT NULL,
+        reason TEXT,
+        seconds REAL,
+        has_thumbnail INTEGER NOT NULL DEFAULT 0
+    )""",
+    "CREATE INDEX IF NOT EXISTS checks_print ON checks (print_id, id)",
+    "CREATE INDEX IF NOT EXISTS checks_ts ON checks (ts)",
+    # Kept apart so listing checks never pages thumbnail blobs in
+    "CREATE TABLE IF NOT EXISTS thumbnails (check_id INTEGER PRIMARY KEY, jpeg BLOB NOT NULL)",
+)
+
+
+class VerdictHistory(object):
+    """Append-only store of finished votes with size- and age-based retention.
+
+    Reads are keyset-paginated on the row id, so a page costs the same on a
+    30-hour print as on a 10-minute one and nothing is accumulated in memory.
+    Retention runs every ``prune_every`` inserts: rows older than ``max_age``
+    seconds go first, then the oldest rows until the database is below
+    ``max_bytes``.
+    """
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024, max_age=30 * 86400, prune_every=20):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.max_age = float(max_age)
+        self.prune_every = max(1, int(prune_every))
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            # Must precede table creation to take effect on a new database
+            self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._db.execute("PRAGMA journal_mode = WAL")
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+
+    def add(self, action, votes, rounds, reason=None, seconds=None, print_id=None, print_name=None, thumbnail=None, ts=None):
+        """Store one finished vote; returns its id."""
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "INSERT INTO checks (print_id, print_name, ts, action, votes, rounds, reason, seconds, has_thumbnail)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    print_id,
+                    print_name,
+                    time.time() if ts is None else ts,
+                    action,
+                    json.dumps(votes),
+                    json.dumps(rounds),
+                    reason,
+                    seconds,
+                    1 if thumbnail else 0,
+                ),
+            )
+            check_id = cur.lastrowid
+            if thumbnail:
+                self._db.execute("INSERT INTO thumbnails (check_id, jpeg) VALUES (?, ?)", (check_id, sqlite3.Binary(thumbnail)))
+            self._inserts += 1
+            if self._inserts % self.prune_every == 0:
+                self._prune()
+        return check_id
+
+    def page(self, before=None, limit=50, print_id=None):
+        """Return up to ``limit`` checks older than id ``before``, newest first.
+
+        The result carries ``next_before`` for the following page, or None
+        once the history is exhausted.
+        """
+        limit = max(1, min(200, int(limit)))
+        clauses, args = [], []
+        if before is not None:
+            clauses.append("id < ?")
+            args.append(int(before))
+        if print_id is not None:
+            clauses.append("print_id = ?")
+            args.append(print_id)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM checks" + where + " ORDER BY id DESC LIMIT ?", args + [limit + 1]
+            ).fetchall()
+        items = [self._row(r) for r in rows[:limit]]
+        return {"items": items, "next_before": items[-1]["id"] if len(rows) > limit else None}
+
+    def thumbnail(self, check_id):
+        with self._lock:
+            row = self._db.execute("SELECT jpeg FROM thumbnails WHERE check_id = ?", (int(check_id),)).fetchone()
+        return bytes(row[0]) if row is not None else None
+
+    def stats(self):
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM checks").fetchone()[0]
+            size = self._size()
+        return {"checks": count, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _size(self):
+        page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        pages = self._db.execute("PRAGMA page_count").fetchone()[0]
+        free = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pages - free) * page_size
+
+    def _prune(self):
+        """Apply age and size limits; caller holds the lock inside a transaction."""
+        if self.max_age > 0:
+            cutoff = time.time() - self.max_age
+            self._db.execute("DELETE FROM thumbnails WHERE check_id IN (SELECT id FROM checks WHERE ts < ?)", (cutoff,))
+            self._db.execute("DELETE FROM checks WHERE ts < ?", (cutoff,))
+        if self.max_bytes > 0:
+            while self._size() > self.max_bytes:
+                count = self._db.execute("SELECT COUNT(*) FROM checks").fetchone()[0]
+                if count <= 1:
+                    break
+                # Drop the oldest tenth at a time rather than row by row
+                oldest = self._db.execute(
+                    "SELECT id FROM checks ORDER BY id LIMIT 1 OFFSET ?", (max(1, count // 10) - 1,)
+                ).fetchone()[0]
+                self._db.execute("DELETE FROM thumbnails WHERE check_id <= ?", (oldest,))
+                self._db.execute("DELETE FROM checks WHERE id <= ?", (oldest,))
+        # Steps once per freed page, so it has to be drained
+        self._db.execute("PRAGMA incremental_vacuum").fetchall()
+
+    @staticmethod
+    def _row(row):
+        item = dict(row)
+        item["votes"] = json.loads(item["votes"])
+        item["rounds"] = json.loads(item["rounds"])
+        item["has_thumbnail"] = bool(item["has_thumbnail"])
+        return item
@@ -0,0 +1,152 @@
+"""Pooled HTTP client shared by snapshot capture, LLM calls and helper requests."""
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+# Per-call retry policy for the current thread, read by _PolicyAdapter
+_retry_override = threading.local()
+
+
+class _ResetRetry(Retry):
+    """Retry refused/reset connections with backoff, but never a read timeout.
+
+    A read timeout on an LLM request means the model is slow, not that the
+    connection went stale; repeating it would only multiply the wait.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if isinstance(error, ReadTimeoutError):
+            # Call the base class on the copy: the copy is a _ResetRetry too and
+            # would land back here. With read=False urllib3 re-raises the timeout.
+            return Retry.increment(self.new(read=False), method, url, response, error, _pool, _stacktrace)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def _build_retry(retries, backoff, connect=None):
+    kwargs = dict(
+        total=retries,
+        connect=retries if connect is None else min(retries, connect),
+        read=retries,
+        status=0,
+        backoff_factor=backoff,
+        raise_on_status=False,
+    )
+    # POST is not idempotent by urllib3's definition, but a reset before any
+    # response arrived is safe to repeat for our read-only LLM queries.
+    methods = frozenset(["GET", "POST"])
+    try:
+        return _ResetRetry(allowed_methods=methods, **kwargs)
+    except TypeError:
+        # urllib3 < 1.26
+        return _ResetRetry(method_whitelist=methods, **kwargs)
+
+
+class _PolicyAdapter(HTTPAdapter):
+    """HTTPAdapter whose retry policy a single call can override.
+
+    requests reads ``max_retries`` for every request it sends, so a
+    thread-local override changes the policy for that call alone while
+    every policy shares the same connection pool.
+    """
+
+    @property
+    def max_retries(self):
+        override = getattr(_retry_override, "retry", None)
+        return self._default_retry if override is None else override
+
+    @max_retries.setter
+    def max_retries(self, value):
+        self._default_retry = value
+
+
+class HttpClient(object):
+    """A requests session with per-host keep-alive pools and split timeouts.
+
+    One instance is owned by the plugin for its whole lifetime so repeated
+    snapshot and LLM requests reuse TCP/TLS connections instead of paying a
+    new handshake every voting round.
+    """
+
+    def __init__(self, pool_size=4, connect_timeout=5.0, read_timeout=30.0, retries=2, backoff=0.5):
+        self._session = requests.Session()
+        # Override policies, keyed by (retries, connect_retries)
+        self._policies = {}
+        self._pool_size = None
+        self._retries = None
+        self._backoff = None
+        self.connect_timeout = float(connect_timeout)
+        self.read_timeout = float(read_timeout)
+        self.configure(pool_size=pool_size, retries=retries, backoff=backoff)
+
+    def configure(self, pool_size=None, connect_timeout=None, read_timeout=None, retries=None, backoff=None):
+        """Update limits in place; adapters are only remounted when pooling/retry settings change."""
+        if connect_timeout is not None:
+            self.connect_timeout = float(connect_timeout)
+        if read_timeout is not None:
+            self.read_timeout = float(read_timeout)
+
+        pool_size = self._pool_size if pool_size is None else max(1, int(pool_size))
+        retries = self._retries if retries is None else max(0, int(retries))
+        backoff = self._backoff if backoff is None else max(0.0, float(backoff))
+        if (pool_size, retries, backoff) == (self._pool_size, self._retries, self._backoff):
+            return
+
+        self._pool_size, self._retries, self._backoff = pool_size, retries, backoff
+        self._policies = {}
+        # pool_connections is the number of per-host pools kept alive,
+        # pool_maxsize the number of sockets kept per host.
+        adapter = _PolicyAdapter(
+            pool_connections=max(4, pool_size),
+            pool_maxsize=pool_size,
+            max_retries=_build_retry(retries, backoff),
+        )
+        old = self._session.adapters.get("https://")
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        if old is not None:
+            old.close()
+        logger.debug("HTTP client configured: pool_size=%s retries=%s backoff=%s", pool_size, retries, backoff)
+
+    def _policy_for(self, retries, connect_retries):
+        """Retry policy for a per-call override, or None to use the configured one."""
+        retries = self._retries if retries is None else max(0, int(retries))
+        connect = None if connect_retries is None else max(0, int(connect_retries))
+        if retries == self._retries and (connect is None or connect >= retries):
+            return None
+        key = (retries, connect)
+        policy = self._policies.get(key)
+        if policy is None:
+            policy = self._policies.setdefault(key, _build_retry(retries, self._backoff, connect))
+        return policy
+
+    def request(self, method, url, read_timeout=None, retries=None, connect_retries=None, **kwargs):
+        """Send a request; ``retries``/``connect_retries`` override the retry policy for this call only.
+
+        ``connect_retries=0`` fails fast on a refused connection while still
+        retrying a reset keep-alive socket, which is what callers with
+        somewhere else to go (another endpoint) want.
+        """
+        timeout = (self.connect_timeout, self.read_timeout if read_timeout is None else float(read_timeout))
+        policy = self._policy_for(retries, connect_retries)
+        if policy is None:
+            return self._session.request(method, url, timeout=timeout, **kwargs)
+        _retry_override.retry = policy
+        try:
+            return self._session.request(method, url, timeout=timeout, **kwargs)
+        finally:
+            _retry_override.retry = None
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self._session.close()
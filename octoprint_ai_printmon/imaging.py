@@ -0,0 +1,102 @@
+"""Snapshot preprocessing: crop, downscale and re-encode frames before upload."""
+import io
+import logging
+import time
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; frames are then sent untouched
+    Image = None
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+
+def imaging_available():
+    return Image is not None
+
+
+def parse_roi(roi):
+    """Validate a region of interest given as [left, top, right, bottom] fractions.
+
+    Returns a tuple of floats, or None if the value is empty or malformed.
+    """
+    if not roi:
+        return None
+    try:
+        left, top, right, bottom = [float(v) for v in roi]
+    except (TypeError, ValueError):
+        logger.warning("Ignoring malformed preprocess_roi %r", roi)
+        return None
+    left, top = max(0.0, left), max(0.0, top)
+    right, bottom = min(1.0, right), min(1.0, bottom)
+    if right <= left or bottom <= top:
+        logger.warning("Ignoring empty preprocess_roi %r", roi)
+        return None
+    return left, top, right, bottom
+
+
+def preprocess_snapshot(img_bytes, roi=None, max_edge=0, quality=80, grayscale=False):
+    """Crop, downscale and re-encode a JPEG snapshot.
+
+    Returns (jpeg_bytes, info) where info records input/output size, the
+    resulting dimensions and the time spent. If Pillow is missing or the
+    frame cannot be decoded the original bytes are returned unchanged.
+    """
+    t0 = time.monotonic()
+    info = {"input_bytes": len(img_bytes), "output_bytes": len(img_bytes), "processed": False}
+    if Image is None:
+        info["seconds"] = time.monotonic() - t0
+        return img_bytes, info
+
+    try:
+        im = Image.open(io.BytesIO(img_bytes))
+        # draft() lets the JPEG decoder skip work when we are going to shrink anyway
+        if max_edge and im.format == "JPEG" and not roi:
+            im.draft("L" if grayscale else "RGB", (max_edge, max_edge))
+        im.load()
+
+        if roi:
+            w, h = im.size
+            im = im.crop((int(roi[0] * w), int(roi[1] * h), int(roi[2] * w), int(roi[3] * h)))
+
+        if max_edge and max(im.size) > max_edge:
+            scale = float(max_edge) / max(im.size)
+            size = (max(1, int(round(im.size[0] * scale))), max(1, int(round(im.size[1] * scale))))
+            im = im.resize(size, Image.BILINEAR)
+
+        im = im.convert("L" if grayscale else "RGB")
+
+        out = io.BytesIO()
+        im.save(out, format="JPEG", quality=int(quality), optimize=False)
+        data = out.getvalue()
+    except Exception:
+        logger.exception("Snapshot preprocessing failed; sending original frame")
+        info["seconds"] = time.monotonic() - t0
+        return img_bytes, info
+
+    info.update(
+        output_bytes=len(data),
+        width=im.size[0],
+        height=im.size[1],
+        processed=True,
+        seconds=time.monotonic() - t0,
+    )
+    return data, info
+
+
+def thumbnail(img_bytes, max_edge=160, quality=60):
+    """Return a small JPEG of ``img_bytes`` for the history, or None without Pillow."""
+    if Image is None or not img_bytes:
+        return None
+    try:
+        im = Image.open(io.BytesIO(img_bytes))
+        if im.format == "JPEG":
+            im.draft("RGB", (max_edge, max_edge))
+        im = im.convert("RGB")
+        im.thumbnail((max_edge, max_edge), Image.BILINEAR)
+        out = io.BytesIO()
+        im.save(out, format="JPEG", quality=int(quality))
+        return out.getvalue()
+    except Exception:
+        logger.exception("Could not create history thumbnail")
+        return None
@@ -0,0 +1,81 @@
+"""Small registry for background jobs started from the settings UI."""
+import collections
+import threading
+import time
+import uuid
+
+
+class JobRegistry(object):
+    """Tracks background jobs and deduplicates identical ones while they run.
+
+    Only the most recent ``max_jobs`` jobs are kept. Every accessor returns a
+    copy so callers can serialize it without holding the lock.
+    """
+
+    def __init__(self, max_jobs=20):
+        self._max_jobs = max_jobs
+        self._jobs = collections.OrderedDict()
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def start(self, key, kind, **fields):
+        """Create a job for ``key`` unless one is already running; returns (job, created)."""
+        with self._lock:
+            job_id = self._active.get(key)
+            if job_id in self._jobs:
+                return self._public(self._jobs[job_id]), False
+
+            job_id = uuid.uuid4().hex[:12]
+            job = dict(
+                fields,
+                id=job_id,
+                kind=kind,
+                state="running",
+                progress=0.0,
+                message="queued",
+                result=None,
+                created=time.time(),
+                finished=None,
+            )
+            self._jobs[job_id] = job
+            self._active[key] = job_id
+            job["_key"] = key
+            while len(self._jobs) > self._max_jobs:
+                self._jobs.popitem(last=False)
+            return self._public(job), True
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            return self._public(job)
+
+    def finish(self, job_id, success, message, result=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(
+                state="done" if success else "failed",
+                progress=1.0,
+                message=message,
+                result=result,
+                finished=time.time(),
+            )
+            self._active.pop(job.get("_key"), None)
+            return self._public(job)
+
+    def get(self, job_id=None):
+        """Return a job by id, or the most recent one if ``job_id`` is None."""
+        with self._lock:
+            if job_id is None:
+                job = next(reversed(self._jobs.values()), None)
+            else:
+                job = self._jobs.get(job_id)
+            return self._public(job) if job is not None else None
+
+    @staticmethod
+    def _public(job):
+        return {k: v for k, v in job.items() if not k.startswith("_")}
@@ -0,0 +1,63 @@
+"""Layer counting from OctoPrint ZChange events, or from DisplayLayerProgress when it is installed."""
+
+
+class LayerTracker(object):
+    """Turns a stream of Z heights into layer changes, ignoring z-hops.
+
+    A rise in Z only becomes a candidate layer. The candidate is confirmed
+    by the next Z event if that one stays at or above it; a drop back to the
+    current layer height means the rise was a z-hop and it is discarded.
+    This confirms each layer one Z move late, which does not matter when
+    only every Nth layer triggers a check.
+
+    Once a layer number arrives from DisplayLayerProgress, which counts from
+    the G-code itself, Z events are ignored for the rest of the print.
+    """
+
+    def __init__(self, tolerance=0.02):
+        self.tolerance = float(tolerance)
+        self.reset()
+
+    def reset(self):
+        self.layer = 0
+        self._base = None
+        self._pending = None
+        self._external = False
+
+    def on_z(self, z):
+        """Feed a new Z height; returns the new layer number once a layer is confirmed, else None."""
+        if self._external or z is None:
+            return None
+        z = float(z)
+        eps = self.tolerance
+        if self._base is None:
+            self._base = z
+            return None
+        if self._pending is None:
+            if z > self._base + eps:
+                self._pending = z
+            return None
+        if z <= self._base + eps:
+            # Came back down: the candidate was a z-hop
+            self._pending = None
+            return None
+        if z >= self._pending - eps:
+            self._base = self._pending
+            self._pending = z if z > self._base + eps else None
+            self.layer += 1
+            return self.layer
+        # Hopped, then came down onto a new layer below the hop height
+        self._pending = z
+        return None
+
+    def on_layer(self, layer):
+        """Feed a layer number reported by another plugin; returns it if it changed, else None."""
+        try:
+            layer = int(layer)
+        except (TypeError, ValueError):
+            return None
+        self._external = True
+        if layer == self.layer:
+            return None
+        self.layer = layer
+        return layer
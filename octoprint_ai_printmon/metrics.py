@@ -0,0 +1,129 @@
+"""Lightweight in-process latency histograms and counters with JSON and Prometheus output."""
+import bisect
+import threading
+
+# Seconds; spans a fast local snapshot up to a slow cold-start LLM call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+class Histogram(object):
+    """Fixed-bucket histogram; ``observe`` is a bisect and three additions under a lock."""
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = []
+        running = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            running += n
+            cumulative.append((bound, running))
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else None,
+            "p50": self._quantile(cumulative, count, 0.5),
+            "p95": self._quantile(cumulative, count, 0.95),
+            "buckets": cumulative,
+        }
+
+    @staticmethod
+    def _quantile(cumulative, count, q):
+        """Upper bucket bound containing quantile ``q`` (None without data)."""
+        if not count:
+            return None
+        rank = q * count
+        for bound, running in cumulative:
+            if running >= rank:
+                return "+Inf" if bound == float("inf") else bound
+        return None
+
+
+class Counter(object):
+    """Monotonic counter, optionally split by a single label."""
+
+    def __init__(self, name, help_text, label=None):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, label_value=None):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            values = dict(self._values)
+        if self.label is None:
+            return values.get(None, 0)
+        return {str(k): v for k, v in values.items()}
+
+
+class MetricsRegistry(object):
+    def __init__(self, prefix="ai_printmon_"):
+        self.prefix = prefix
+        self._metrics = {}
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def counter(self, name, help_text, label=None):
+        return self._metrics.setdefault(name, Counter(name, help_text, label))
+
+    def observe(self, name, value):
+        self._metrics[name].observe(value)
+
+    def inc(self, name, amount=1, label_value=None):
+        self._metrics[name].inc(amount, label_value)
+
+    def to_dict(self):
+        out = {}
+        for name, metric in self._metrics.items():
+            snap = metric.snapshot()
+            if isinstance(metric, Histogram):
+                snap = dict(snap, buckets=[["+Inf" if b == float("inf") else b, n] for b, n in snap["buckets"]])
+            out[name] = snap
+        return out
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for name, metric in self._metrics.items():
+            full = self.prefix + name
+            lines.append("# HELP %s %s" % (full, metric.help))
+            if isinstance(metric, Histogram):
+                lines.append("# TYPE %s histogram" % full)
+                snap = metric.snapshot()
+                for bound, running in snap["buckets"]:
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    lines.append('%s_bucket{le="%s"} %d' % (full, le, running))
+                lines.append("%s_sum %r" % (full, float(snap["sum"])))
+                lines.append("%s_count %d" % (full, snap["count"]))
+            else:
+                lines.append("# TYPE %s counter" % full)
+                snap = metric.snapshot()
+                if metric.label is None:
+                    lines.append("%s %s" % (full, snap))
+                else:
+                    for value, n in sorted(snap.items()):
+                        escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+                        lines.append('%s{%s="%s"} %s' % (full, metric.label, escaped, n))
+        return "\n".join(lines) + "\n"
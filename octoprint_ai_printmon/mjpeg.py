@@ -0,0 +1,167 @@
+"""Background reader that keeps an MJPEG stream open and buffers the latest frames."""
+import collections
+import logging
+import re
+import threading
+import time
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+# A part that grows past this without a boundary is garbage; drop it and resync
+MAX_PART_BYTES = 8 * 1024 * 1024
+
+
+def stream_url_from_snapshot(snapshot_url):
+    """Derive the ``?action=stream`` URL used by mjpg-streamer/ustreamer from a snapshot URL."""
+    if not snapshot_url or "action=snapshot" not in snapshot_url:
+        return None
+    return snapshot_url.replace("action=snapshot", "action=stream")
+
+
+class MultipartJpegParser(object):
+    """Incremental parser for ``multipart/x-mixed-replace`` bodies.
+
+    Uses each part's Content-Length when the server sends one and otherwise
+    scans for the next boundary, so chunks may be split anywhere.
+    """
+
+    def __init__(self, boundary):
+        boundary = boundary.strip().strip('"')
+        if not boundary.startswith("--"):
+            boundary = "--" + boundary
+        self._boundary = boundary.encode("latin-1")
+        self._buf = bytearray()
+        self._in_body = False
+        self._length = None
+
+    def feed(self, data):
+        """Consume a chunk and return the list of complete frames it finished."""
+        self._buf += data
+        frames = []
+        while True:
+            if not self._in_body:
+                start = self._buf.find(self._boundary)
+                if start < 0:
+                    # Keep a tail in case the boundary is split across chunks
+                    del self._buf[: max(0, len(self._buf) - len(self._boundary))]
+                    break
+                header_end = self._buf.find(b"\r\n\r\n", start)
+                if header_end < 0:
+                    del self._buf[:start]
+                    break
+                headers = bytes(self._buf[start + len(self._boundary) : header_end]).decode("latin-1")
+                match = re.search(r"content-length:\s*(\d+)", headers, re.IGNORECASE)
+                self._length = int(match.group(1)) if match else None
+                del self._buf[: header_end + 4]
+                self._in_body = True
+
+            if self._length is not None:
+                if len(self._buf) < self._length:
+                    break
+                frames.append(bytes(self._buf[: self._length]))
+                del self._buf[: self._length]
+            else:
+                end = self._buf.find(self._boundary)
+                if end < 0:
+                    if len(self._buf) > MAX_PART_BYTES:
+                        logger.warning("MJPEG part exceeded %d bytes without a boundary; resyncing", MAX_PART_BYTES)
+                        del self._buf[:]
+                        self._in_body = False
+                    break
+                frames.append(bytes(self._buf[:end]).rstrip(b"\r\n"))
+                del self._buf[:end]
+            self._in_body = False
+        return frames
+
+
+class MjpegStreamReader(object):
+    """Keeps one connection to an MJPEG endpoint open and holds the last few frames.
+
+    Frames are stored with their arrival time in a fixed-size ring buffer so
+    voting rounds can grab the newest one instantly. The reader reconnects
+    on errors until ``stop`` is called.
+    """
+
+    def __init__(self, http, url, buffer_frames=4, reconnect_delay=2.0, read_timeout=10.0):
+        self._http = http
+        self.url = url
+        self._frames = collections.deque(maxlen=max(1, int(buffer_frames)))
+        self._reconnect_delay = reconnect_delay
+        self._read_timeout = read_timeout
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._resp = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ai_printmon_mjpeg", daemon=True)
+        self._thread.start()
+        logger.info("MJPEG reader started on %s", self.url)
+
+    def stop(self):
+        self._stop.set()
+        resp = self._resp
+        if resp is not None:
+            # Closing the response unblocks the reader thread's pending read
+            try:
+                resp.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._lock:
+            self._frames.clear()
+        logger.info("MJPEG reader stopped")
+
+    def latest(self, max_age=None):
+        """Return (timestamp, jpeg_bytes) of the newest frame, or None if none is fresh enough."""
+        with self._lock:
+            if not self._frames:
+                return None
+            ts, frame = self._frames[-1]
+        if max_age is not None and time.monotonic() - ts > max_age:
+            return None
+        return ts, frame
+
+    def frames(self):
+        """Return a copy of the buffered (timestamp, jpeg_bytes) pairs, oldest first."""
+        with self._lock:
+            return list(self._frames)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._read_stream()
+            except Exception:
+                if not self._stop.is_set():
+                    logger.warning("MJPEG stream %s failed; reconnecting", self.url, exc_info=True)
+            finally:
+                self._resp = None
+            self._stop.wait(self._reconnect_delay)
+
+    def _read_stream(self):
+        resp = self._http.get(self.url, stream=True, read_timeout=self._read_timeout)
+        self._resp = resp
+        try:
+            resp.raise_for_status()
+            content_type = resp.headers.get("Content-Type", "")
+            match = re.search(r"boundary=([^;]+)", content_type)
+            if not match:
+                raise ValueError("Not a multipart stream: %r" % content_type)
+            parser = MultipartJpegParser(match.group(1))
+            for chunk in resp.iter_content(chunk_size=8192):
+                if self._stop.is_set():
+                    return
+                for frame in parser.feed(chunk):
+                    with self._lock:
+                        self._frames.append((time.monotonic(), frame))
+        finally:
+            resp.close()
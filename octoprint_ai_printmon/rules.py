@@ -0,0 +1,84 @@
+"""Failure rules compiled into lookup tables so a vote can stop as soon as its outcome is fixed."""
+import logging
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+# Least to most severe; when several rules trigger, the most severe action wins
+ACTIONS = ("none", "warn", "pause", "cancel", "cancel_stop_queue")
+ACTION_ALIASES = {"nothing": "none"}
+
+
+def parse_threshold(text):
+    """Parse "2/3" into (2, 3); returns None for anything malformed."""
+    try:
+        fails, _, rounds = str(text).partition("/")
+        fails, rounds = int(fails), int(rounds)
+    except (TypeError, ValueError):
+        return None
+    if rounds < 1 or not 0 <= fails <= rounds:
+        return None
+    return fails, rounds
+
+
+class RuleTable(object):
+    """Precomputed (fails, rounds) -> action lookups for a list of failure rules.
+
+    A rule whose denominator equals the configured round count applies as
+    written. If no rule is written for that round count, every rule applies
+    proportionally, so "2/3" means "at least two thirds of the rounds".
+
+    ``decided`` also maps (fails, votes_cast, rounds) to the final action
+    once no combination of the remaining votes can change it, or to None
+    while the outcome is still open.
+    """
+
+    def __init__(self, rules, max_rounds=3):
+        self.rules = []
+        for rule in rules or []:
+            threshold = parse_threshold(rule.get("threshold")) if isinstance(rule, dict) else None
+            action = ACTION_ALIASES.get(rule.get("action"), rule.get("action")) if isinstance(rule, dict) else None
+            if threshold is None or action not in ACTIONS:
+                logger.warning("Ignoring invalid failure rule %r", rule)
+                continue
+            self.rules.append((threshold[0], threshold[1], action))
+
+        self.final = {}
+        self.decided = {}
+        for rounds in range(1, max(1, int(max_rounds)) + 1):
+            self._compile(rounds)
+
+    def _compile(self, rounds):
+        exact = [r for r in self.rules if r[1] == rounds]
+        for fails in range(rounds + 1):
+            triggered = [
+                action
+                for k, n, action in (exact or self.rules)
+                if (fails >= k if exact else fails * n >= k * rounds)
+            ]
+            self.final[(fails, rounds)] = max(triggered, key=ACTIONS.index) if triggered else "none"
+
+        for cast in range(rounds + 1):
+            remaining = rounds - cast
+            for fails in range(cast + 1):
+                outcomes = {self.final[(f, rounds)] for f in range(fails, fails + remaining + 1)}
+                self.decided[(fails, cast, rounds)] = outcomes.pop() if len(outcomes) == 1 else None
+
+    def action(self, fails, rounds):
+        """Action for a finished vote; unknown round counts are compiled on first use."""
+        if rounds <= 0:
+            return "none"
+        if (fails, rounds) not in self.final:
+            self._compile(rounds)
+        return self.final[(min(fails, rounds), rounds)]
+
+    def decide(self, fails, cast, rounds):
+        """Final action if it can no longer change after ``cast`` of ``rounds`` votes, else None."""
+        if rounds <= 0:
+            return "none"
+        if (fails, cast, rounds) not in self.decided:
+            if (0, rounds) not in self.final:
+                self._compile(rounds)
+            if (fails, cast, rounds) not in self.decided:
+                # More votes than rounds (should not happen); settle on what we have
+                return self.action(fails, rounds)
+        return self.decided[(fails, cast, rounds)]
@@ -0,0 +1,130 @@
+"""Immutable snapshot of everything the check path reads, rebuilt whenever settings are applied."""
+import collections
+import json
+
+from .endpoints import build_headers
+from .rules import RuleTable
+
+VERDICT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "status": {"type": "string", "enum": ["ok", "fail"]},
+        "reason": {"type": "string"},
+    },
+    "required": ["status"],
+}
+
+# Stands in for the image while a request template is serialized; JSON-escaped
+# it cannot collide with anything in a system prompt typed into the settings
+_IMAGE_PLACEHOLDER = "\x00image\x00"
+_VOTING_MODES = ("sequential", "pipelined", "multi_frame")
+_RESPONSE_FORMATS = ("none", "json_object", "json_schema")
+
+
+_FIELDS = (
+    "provider_preset",
+    "api_endpoint",
+    "model",
+    "api_key",
+    "headers",
+    "system_prompt",
+    "snapshot_url",
+    "rounds",
+    "round_delay",
+    "voting_mode",
+    "rule_table",
+    "llm_stream",
+    "llm_stream_collect_reason",
+    "llm_max_tokens",
+    "llm_response_format",
+    "verdict_templates",
+)
+
+
+class RuntimeConfig(collections.namedtuple("RuntimeConfig", _FIELDS)):
+    """Settings for the check path, parsed and pre-serialized once.
+
+    Instances are never modified: ``apply_settings`` builds a new one and
+    swaps it in with a single assignment, and each check reads the attribute
+    once, so a settings save in the middle of a vote cannot mix old and new
+    values.
+
+    ``verdict_templates`` maps a model name to the serialized single-frame
+    request split around the image, so sending a frame is two string joins
+    instead of building and dumping a payload dict.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_settings(cls, s, extra_models=()):
+        rounds = int(s.get("rounds", 3))
+        voting_mode = s.get("voting_mode", "sequential")
+        if voting_mode not in _VOTING_MODES:
+            voting_mode = "sequential"
+        response_format = s.get("llm_response_format", "none")
+        if response_format not in _RESPONSE_FORMATS:
+            response_format = "none"
+
+        config = cls(
+            provider_preset=s.get("provider_preset"),
+            api_endpoint=s.get("api_endpoint"),
+            model=s.get("model"),
+            api_key=s.get("api_key") or "",
+            headers=build_headers(s.get("api_key")),
+            system_prompt=s.get("system_prompt") or "",
+            snapshot_url=s.get("snapshot_url"),
+            rounds=rounds,
+            round_delay=max(0.0, float(s.get("round_delay", 3))),
+            voting_mode=voting_mode,
+            rule_table=RuleTable(s.get("failure_rules"), max_rounds=max(3, rounds)),
+            llm_stream=bool(s.get("llm_stream", False)),
+            llm_stream_collect_reason=bool(s.get("llm_stream_collect_reason", True)),
+            llm_max_tokens=int(s.get("llm_max_tokens", 0) or 0),
+            llm_response_format=response_format,
+            verdict_templates={},
+        )
+        for model in {config.model, *extra_models}:
+            config.verdict_templates[model] = config._verdict_template(model, config.system_prompt)
+        return config
+
+    def apply_output_options(self, payload, schema, scale=1):
+        """Add the configured output-token cap and JSON-mode/structured-output flags to a payload."""
+        if self.llm_max_tokens > 0:
+            payload["max_tokens"] = self.llm_max_tokens * scale
+        if self.llm_response_format == "json_object":
+            payload["response_format"] = {"type": "json_object"}
+        elif self.llm_response_format == "json_schema":
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "print_verdict", "schema": schema},
+            }
+
+    def _verdict_template(self, model, system_prompt):
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                # Many providers accept images inline in the message content; sending
+                # the data URL as the user content keeps this provider-agnostic.
+                {"role": "user", "content": _IMAGE_PLACEHOLDER},
+            ],
+            "n": 1,
+        }
+        self.apply_output_options(payload, VERDICT_SCHEMA)
+        if self.llm_stream:
+            payload["stream"] = True
+        prefix, suffix = json.dumps(payload).split(json.dumps(_IMAGE_PLACEHOLDER))
+        return prefix, suffix
+
+    def verdict_body(self, model, data_url, system_prompt=None):
+        """Serialized single-frame request for ``model``.
+
+        Templates are prebuilt for the configured models; anything else (a
+        connection test against an unsaved endpoint) is built on the fly.
+        """
+        template = self.verdict_templates.get(model) if system_prompt is None else None
+        if template is None:
+            template = self._verdict_template(model, system_prompt or self.system_prompt)
+        # A base64 data URL contains nothing JSON needs to escape
+        return template[0] + '"' + data_url + '"' + template[1]
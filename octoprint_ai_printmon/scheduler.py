@@ -0,0 +1,140 @@
+"""Long-lived scheduler thread that runs monitoring checks on a monotonic clock."""
+import logging
+import threading
+import time
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+
+class MonitorScheduler(object):
+    """Runs ``callback`` whenever ``interval_fn()`` seconds of unpaused time have passed.
+
+    Time spent paused does not count towards the interval, so resuming
+    continues where the countdown left off. The interval is re-read from
+    ``interval_fn`` after every check and on ``reschedule``, which lets the
+    caller adapt it to recent results. ``trigger`` runs a check early, e.g.
+    on a layer change; the interval then acts as a wall-clock fallback and
+    restarts after every check. One thread serves the whole print.
+    """
+
+    def __init__(self, callback, interval_fn, name="ai_printmon_scheduler"):
+        self._callback = callback
+        self._interval_fn = interval_fn
+        self._name = name
+        self._cond = threading.Condition()
+        self._thread_active = False
+        self._running = False
+        self._paused = False
+        self._elapsed = 0.0
+        self._resumed_at = 0.0
+        self._interval = 0.0
+        self._trigger_at = None
+        self._last_run = None
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._paused = False
+            self._elapsed = 0.0
+            self._resumed_at = time.monotonic()
+            self._interval = self._interval_fn()
+            self._trigger_at = None
+            self._last_run = None
+            if not self._thread_active:
+                self._thread_active = True
+                threading.Thread(target=self._run, name=self._name, daemon=True).start()
+            self._cond.notify_all()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def pause(self):
+        with self._cond:
+            if self._running and not self._paused:
+                self._elapsed += time.monotonic() - self._resumed_at
+                self._paused = True
+                # A frame requested before the pause would show a parked head
+                self._trigger_at = None
+                self._cond.notify_all()
+
+    def resume(self):
+        with self._cond:
+            if self._paused:
+                self._paused = False
+                self._resumed_at = time.monotonic()
+                self._cond.notify_all()
+
+    def reschedule(self):
+        """Re-read the interval now, e.g. after settings changed."""
+        with self._cond:
+            self._interval = self._interval_fn()
+            self._cond.notify_all()
+
+    def trigger(self, delay=0.0, min_gap=0.0):
+        """Run a check ``delay`` seconds from now instead of waiting for the interval.
+
+        Ignored (returns False) while paused, when a triggered check is
+        already pending, or if the last check started less than ``min_gap``
+        seconds ago.
+        """
+        with self._cond:
+            if not self._running or self._paused or self._trigger_at is not None:
+                return False
+            now = time.monotonic()
+            if self._last_run is not None and now - self._last_run < min_gap:
+                return False
+            self._trigger_at = now + max(0.0, delay)
+            self._cond.notify_all()
+            return True
+
+    def seconds_until_next(self):
+        with self._cond:
+            elapsed = self._elapsed
+            if not self._paused:
+                elapsed += time.monotonic() - self._resumed_at
+            remaining = self._interval - elapsed
+            if self._trigger_at is not None:
+                remaining = min(remaining, self._trigger_at - time.monotonic())
+            return max(0.0, remaining)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        self._thread_active = False
+                        return
+                    if self._paused:
+                        self._cond.wait()
+                        continue
+                    now = time.monotonic()
+                    remaining = self._interval - (self._elapsed + now - self._resumed_at)
+                    if self._trigger_at is not None:
+                        remaining = min(remaining, self._trigger_at - now)
+                    if remaining <= 0:
+                        self._trigger_at = None
+                        self._last_run = now
+                        break
+                    self._cond.wait(remaining)
+
+            try:
+                self._callback()
+            except Exception:
+                logger.exception("Scheduled check failed")
+
+            with self._cond:
+                self._elapsed = 0.0
+                self._resumed_at = time.monotonic()
+                self._interval = self._interval_fn()
@@ -20,6 +20,8 @@ $(function () {
         self.rounds = ko.observable(3);
         self.round_delay = ko.observable(3);
         self.cooldown_minutes = ko.observable(15);
+        self.voting_mode = ko.observable('sequential');
+        self.votingModes = ['sequential', 'pipelined', 'multi_frame'];
 
         self.failure_rules_json = ko.observable('');
         self.system_prompt = ko.observable('');
@@ -40,6 +42,7 @@ $(function () {
             self.rounds(s.rounds || 3);
             self.round_delay(s.round_delay || 3);
             self.cooldown_minutes(s.cooldown_minutes || 15);
+            self.voting_mode(s.voting_mode || 'sequential');
 
             try {
                 self.failure_rules_json(JSON.stringify(s.failure_rules || [], null, 2));
@@ -82,6 +85,7 @@ $(function () {
                     rounds: Number(self.rounds()),
                     round_delay: Number(self.round_delay()),
                     cooldown_minutes: Number(self.cooldown_minutes()),
+                    voting_mode: self.voting_mode(),
                     failure_rules: rules,
                     system_prompt: self.system_prompt(),
                 }
@@ -109,33 +113,131 @@ $(function () {
             self.system_prompt('You are a 3D print failure detection system. You will receive an image of a 3D print in progress captured from a webcam. Analyze the image for signs of failure and respond with ONLY a JSON object: {"status": "ok"} or {"status": "fail", "reason": "..."}.');
         };
 
-        // Test Connection - calls a plugin API action (backend implementation is planned separately)
-        self.testConnection = function () {
+        // Test Connection - starts a background job on the plugin and follows its progress
+        self.testJobId = null;
+        self.testStatus = ko.observable('');
+        self.testPollTimer = null;
+
+        self.formatTimings = function (timings) {
+            if (!timings) return '';
+            var parts = [];
+            _.each(timings, function (v, k) {
+                if (k === 'image_bytes') {
+                    parts.push(k + ' ' + v);
+                } else {
+                    parts.push(k + ' ' + Number(v).toFixed(2) + 's');
+                }
+            });
+            return parts.join(', ');
+        };
+
+        self.onTestJobUpdate = function (job) {
+            if (!job || job.id !== self.testJobId) return;
+            if (job.state === 'running') {
+                self.testStatus(job.message + ' (' + Math.round(job.progress * 100) + '%)');
+                return;
+            }
+            if (self.testPollTimer) {
+                clearInterval(self.testPollTimer);
+                self.testPollTimer = null;
+            }
+            self.testJobId = null;
+            self.testing(false);
+            var timings = self.formatTimings(job.result && job.result.timings);
+            self.testStatus(job.message + (timings ? ' [' + timings + ']' : ''));
+            new PNotify({
+                title: job.state === 'done' ? "Connection successful" : "Connection failed",
+                text: job.message + (timings ? '\n' + timings : ''),
+                type: job.state === 'done' ? "success" : "error"
+            });
+        };
+
+        self.onDataUpdaterPluginMessage = function (plugin, data) {
+            if (plugin !== "ai_printmon" || !data) return;
+            if (data.type === "test_job") self.onTestJobUpdate(data.job);
+        };
+
+        self.runTest = function (mode) {
             self.testing(true);
+            self.testStatus('starting...');
             var payload = {
                 endpoint: self.api_endpoint(),
                 api_key: self.api_key(),
-                model: self.model_name()
+                model: self.model_name(),
+                mode: mode
             };
 
-            // Use OctoPrint's simpleApiCommand helper to call the plugin action (backend not implemented yet)
             OctoPrint.simpleApiCommand("ai_printmon", "test_connection", payload).done(function (response) {
-                new PNotify({
-                    title: "Connection successful",
-                    text: "Test connection succeeded.",
-                    type: "success"
-                });
+                if (!response || !response.success) {
+                    self.testing(false);
+                    self.testStatus('');
+                    new PNotify({ title: "Connection failed", text: (response && response.message) || "Test could not be started.", type: "error" });
+                    return;
+                }
+                self.testJobId = response.job_id;
+                self.onTestJobUpdate(response.job);
+                // Poll as a fallback in case a push message is missed
+                if (self.testPollTimer) clearInterval(self.testPollTimer);
+                self.testPollTimer = setInterval(function () {
+                    if (!self.testJobId) return;
+                    OctoPrint.simpleApiGet("ai_printmon", { data: { view: "test_job", id: self.testJobId } }).done(function (r) {
+                        if (r && r.job) self.onTestJobUpdate(r.job);
+                    });
+                }, 3000);
             }).fail(function () {
+                self.testing(false);
+                self.testStatus('');
                 new PNotify({
                     title: "Connection failed",
                     text: "Test connection failed. Check endpoint/key.",
                     type: "error"
                 });
+            });
+        };
+
+        self.testConnection = function () {
+            self.runTest('text');
+        };
+
+        self.testImageRoundTrip = function () {
+            self.runTest('image');
+        };
+
+        // History - pages through recorded checks, newest first
+        self.history = ko.observableArray([]);
+        self.historyNextBefore = ko.observable(null);
+        self.historyLoading = ko.observable(false);
+        self.historyError = ko.observable('');
+
+        self.loadHistory = function (reset) {
+            if (self.historyLoading()) return;
+            var params = { view: "history", limit: 25 };
+            if (!reset && self.historyNextBefore() !== null) params.before = self.historyNextBefore();
+            self.historyLoading(true);
+            OctoPrint.simpleApiGet("ai_printmon", { data: params }).done(function (response) {
+                self.historyError('');
+                if (reset) self.history.removeAll();
+                ko.utils.arrayPushAll(self.history, response.items || []);
+                self.historyNextBefore(response.next_before === undefined ? null : response.next_before);
+            }).fail(function (xhr) {
+                self.historyError(xhr && xhr.status === 404 ? 'History is disabled.' : 'Could not load history.');
             }).always(function () {
-                self.testing(false);
+                self.historyLoading(false);
             });
         };
 
+        self.thumbnailUrl = function (id) {
+            return OctoPrint.getSimpleApiUrl("ai_printmon") + "?view=thumbnail&id=" + id;
+        };
+
+        self.formatTime = function (ts) {
+            return new Date(ts * 1000).toLocaleString();
+        };
+
+        self.activeTab.subscribe(function (tab) {
+            if (tab === 'history' && !self.history().length) self.loadHistory(true);
+        });
+
         // Apply Settings Now - validates and sends all current settings to the backend
         self.applying = ko.observable(false);
         self.applySettings = function () {
@@ -0,0 +1,106 @@
+"""Server-sent-events reader for streamed chat completions with early verdict detection."""
+import json
+import logging
+import re
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+_STATUS_RE = re.compile(r'"status"\s*:\s*"(ok|fail)"')
+
+
+class VerdictScanner(object):
+    """Incrementally scans streamed text for the verdict object.
+
+    ``status`` is set as soon as a complete ``"status": "ok"|"fail"`` pair has
+    arrived; ``complete`` once the outermost JSON object has closed. Braces
+    inside string literals are ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.status = None
+        self.complete = False
+        self._scan_from = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, delta):
+        start = len(self.text)
+        self.text += delta
+        if self.status is None:
+            match = _STATUS_RE.search(self.text, self._scan_from)
+            if match:
+                self.status = match.group(1)
+            else:
+                # Re-scan a short overlap so a pair split across deltas is found
+                self._scan_from = max(0, len(self.text) - 32)
+        if not self.complete:
+            self._track_braces(start)
+
+    def _track_braces(self, start):
+        for ch in self.text[start:]:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = self._started
+            elif ch == "{":
+                self._depth += 1
+                self._started = True
+            elif ch == "}" and self._started:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+                    return
+
+
+def iter_sse_deltas(resp):
+    """Yield content deltas from an OpenAI-style ``text/event-stream`` response."""
+    for line in resp.iter_lines():
+        if not line or not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            return
+        try:
+            event = json.loads(data)
+        except ValueError:
+            logger.debug("Skipping malformed SSE event %r", data[:100])
+            continue
+        for choice in event.get("choices") or ():
+            delta = (choice.get("delta") or {}).get("content") or choice.get("text")
+            if delta:
+                yield delta
+
+
+def read_streamed_completion(resp, collect_reason=True):
+    """Consume a streamed completion and return it in the non-streaming response shape.
+
+    Reading stops as soon as the status is known and no reason is wanted
+    (always for "ok"; for "fail" only if ``collect_reason`` is False) or
+    once the verdict object is complete. The returned dict carries
+    ``early_exit`` so callers can tell a truncated read from a full one.
+    """
+    scanner = VerdictScanner()
+    early_exit = False
+    try:
+        for delta in iter_sse_deltas(resp):
+            scanner.feed(delta)
+            if scanner.complete:
+                break
+            if scanner.status == "ok" or (scanner.status == "fail" and not collect_reason):
+                early_exit = True
+                break
+    finally:
+        resp.close()
+
+    content = scanner.text
+    if early_exit:
+        content = json.dumps({"status": scanner.status})
+    return {"choices": [{"message": {"content": content}}], "early_exit": early_exit}
@@ -0,0 +1,95 @@
+"""Bounded cache of LLM verdicts keyed by a perceptual hash of the snapshot."""
+import collections
+import io
+import logging
+import threading
+import time
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it nothing is cached
+    Image = None
+
+logger = logging.getLogger("octoprint.plugins.ai_printmon")
+
+
+def perceptual_hash(img_bytes):
+    """Return a 64-bit difference hash (dHash) of a JPEG, or None if it cannot be computed."""
+    if img_bytes is None or Image is None:
+        return None
+    try:
+        im = Image.open(io.BytesIO(img_bytes))
+        im.draft("L", (64, 64))
+        px = list(im.convert("L").resize((9, 8), Image.BILINEAR).getdata())
+    except Exception:
+        logger.exception("Could not compute perceptual hash")
+        return None
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class VerdictCache(object):
+    """LRU cache with TTL that matches near-identical frames within a Hamming distance.
+
+    Entries are scoped by ``context`` (model and system prompt) so changing
+    either never reuses a verdict produced under different instructions.
+    """
+
+    def __init__(self, max_entries=64, ttl=300, max_distance=4):
+        self.max_entries = int(max_entries)
+        self.ttl = float(ttl)
+        self.max_distance = int(max_distance)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, img_hash, context, now=None):
+        if img_hash is None:
+            return None
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for key in reversed(list(self._entries)):
+                entry_context, entry_hash, verdict, stored_at = self._entries[key]
+                if now - stored_at > self.ttl:
+                    del self._entries[key]
+                    continue
+                if entry_context == context and hamming(entry_hash, img_hash) <= self.max_distance:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(verdict)
+            self.misses += 1
+            return None
+
+    def put(self, img_hash, context, verdict, now=None):
+        if img_hash is None or self.max_entries <= 0:
+            return
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            key = (context, img_hash)
+            self._entries.pop(key, None)
+            self._entries[key] = (context, img_hash, dict(verdict), now)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
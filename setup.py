@@ -6,6 +6,9 @@ setup(
     description="AI-based print monitoring plugin for OctoPrint (skeleton)",
     packages=["octoprint_ai_printmon"],
     install_requires=["requests"],
+    extras_require={
+        "imaging": ["Pillow", "numpy"],
+    },
     entry_points={
         "octoprint.plugin": [
             "ai_printmon = octoprint_ai_printmon:AIPrintMonPlugin"
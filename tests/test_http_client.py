@@ -0,0 +1,121 @@
+import importlib.util
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+# Loaded from its file so the test does not need OctoPrint for the package __init__
+_spec = importlib.util.spec_from_file_location(
+    "ai_printmon_http_client",
+    os.path.join(os.path.dirname(__file__), os.pardir, "octoprint_ai_printmon", "http_client.py"),
+)
+http_client = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(http_client)
+
+
+@pytest.fixture
+def silent_server():
+    """A server that accepts connections and never answers; yields (url, accepted connections)."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    server.settimeout(0.1)
+    accepted = []
+    stop = threading.Event()
+
+    def serve():
+        while not stop.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            accepted.append(conn)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d/" % server.getsockname()[1], accepted
+    stop.set()
+    thread.join(1)
+    server.close()
+    for conn in accepted:
+        conn.close()
+
+
+def test_read_timeout_is_raised_and_not_retried(silent_server):
+    url, accepted = silent_server
+    client = http_client.HttpClient(retries=2, backoff=0)
+    try:
+        t0 = time.monotonic()
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.post(url, data=b"{}", read_timeout=0.3)
+        assert time.monotonic() - t0 < 2
+        assert len(accepted) == 1
+    finally:
+        client.close()
+
+
+@pytest.fixture
+def keepalive_server():
+    """An HTTP/1.1 server answering 200 with keep-alive; yields (url, set of client ports seen)."""
+    import http.server
+
+    ports = set()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self):
+            ports.add(self.client_address[1])
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        do_GET = do_POST = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d/" % server.server_address[1], ports
+    server.shutdown()
+    server.server_close()
+
+
+def test_retry_overrides_share_the_connection_pool(keepalive_server):
+    url, ports = keepalive_server
+    client = http_client.HttpClient(retries=2, backoff=0)
+    try:
+        client.post(url, data=b"{}")
+        client.post(url, data=b"{}", connect_retries=0)
+        client.post(url, data=b"{}", retries=0)
+        assert len(ports) == 1
+    finally:
+        client.close()
+
+
+def test_refused_connection_is_not_retried_when_overridden():
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    client = http_client.HttpClient(retries=3, backoff=0.5)
+    try:
+        t0 = time.monotonic()
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.post("http://127.0.0.1:%d/" % port, data=b"{}", connect_retries=0)
+        # Three retries with 0.5 s backoff would take well over a second
+        assert time.monotonic() - t0 < 1
+    finally:
+        client.close()